@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:39
+
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_vote_counters(apps, schema_editor):
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    Vote = apps.get_model('core', 'Vote')
+    Answer = apps.get_model('answers', 'answer')
+
+    content_type = ContentType.objects.filter(app_label='answers', model='answer').first()
+    if content_type is None:
+        return
+
+    def count_of(vote_type):
+        votes = (
+            Vote.objects
+            .filter(content_type=content_type, object_id=OuterRef('pk'), vote_type=vote_type)
+            .order_by()
+            .values('object_id')
+            .annotate(total=Count('id'))
+            .values('total')
+        )
+        return Coalesce(Subquery(votes), Value(0))
+
+    Answer.objects.update(upvotes=count_of('up'), downvotes=count_of('down'))
+    Answer.objects.update(score=F('upvotes') - F('downvotes'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('answers', '0002_initial'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='answer',
+            name='downvotes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='answer',
+            name='score',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='answer',
+            name='upvotes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_vote_counters, migrations.RunPython.noop),
+    ]
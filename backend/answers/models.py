@@ -15,6 +15,11 @@ class Answer(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_best_answer = models.BooleanField(default=False)
     
+    # Denormalized vote counters (kept in sync by core.voting)
+    upvotes = models.PositiveIntegerField(default=0)
+    downvotes = models.PositiveIntegerField(default=0)
+    score = models.IntegerField(default=0)
+    
     # Generic Relations to core models
     votes = GenericRelation('core.Vote', related_query_name='answer')
     comments = GenericRelation('core.Comment', related_query_name='answer')
@@ -32,9 +37,7 @@ class Answer(models.Model):
         return f"Answer to: {self.question.title}"
     
     def vote_count(self):
-        upvotes = self.votes.filter(vote_type='up').count()
-        downvotes = self.votes.filter(vote_type='down').count()
-        return upvotes - downvotes
+        return self.score
     
     def mark_as_best(self):
         """Mark this answer as the best answer"""
@@ -1,11 +1,13 @@
 from rest_framework import serializers
 from .models import Answer
+from core.serializers import MyVoteField
 
 class AnswerSerializer(serializers.ModelSerializer):
     username = serializers.CharField(source='user.username', read_only=True)
     question_title = serializers.CharField(source='question.title', read_only=True)
+    my_vote = MyVoteField(kind='answer')
     
     class Meta:
         model = Answer
-        fields = ['id', 'body', 'user', 'username', 'question', 'question_title', 'created_at', 'is_best_answer', 'vote_count']
-        read_only_fields = ['user', 'created_at', 'is_best_answer']
+        fields = ['id', 'body', 'user', 'username', 'question', 'question_title', 'created_at', 'is_best_answer', 'upvotes', 'downvotes', 'score', 'vote_count', 'my_vote']
+        read_only_fields = ['user', 'created_at', 'is_best_answer', 'upvotes', 'downvotes', 'score']
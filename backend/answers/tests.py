@@ -2,6 +2,8 @@ from django.test import TestCase
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from questions.models import Question
 from answers.models import Answer
 
@@ -192,3 +194,63 @@ class RoleSelectionTestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         user = User.objects.get(username='instructor1')
         self.assertEqual(user.role, 'instructor')
+
+
+class AnswerListFilterTestCase(TestCase):
+    """Test cases for filtering and paginating the answer list"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.user_a = User.objects.create_user(
+            username='user_a',
+            email='usera@example.com',
+            password='pass123'
+        )
+        self.user_b = User.objects.create_user(
+            username='user_b',
+            email='userb@example.com',
+            password='pass123'
+        )
+        self.question = Question.objects.create(title='Question', body='Body', user=self.user_a)
+        self.other_question = Question.objects.create(title='Other', body='Body', user=self.user_a)
+        self.answers = [
+            Answer.objects.create(question=self.question, body=f'Answer {i}', user=self.user_b)
+            for i in range(3)
+        ]
+        Answer.objects.create(question=self.other_question, body='Elsewhere', user=self.user_a)
+    
+    def test_filter_by_question(self):
+        """Test that ?question= only returns that question's answers"""
+        response = self.client.get(f'/api/answers/?question={self.question.id}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 3)
+        self.assertTrue(all(a['question'] == self.question.id for a in response.data))
+    
+    def test_filter_by_user(self):
+        """Test that ?user= only returns that user's answers"""
+        response = self.client.get(f'/api/answers/?user={self.user_a.id}')
+        self.assertEqual([a['body'] for a in response.data], ['Elsewhere'])
+    
+    def test_best_answer_listed_first(self):
+        """Test that the unpaginated list keeps the best answer on top"""
+        self.answers[0].mark_as_best()
+        response = self.client.get(f'/api/answers/?question={self.question.id}')
+        self.assertEqual(response.data[0]['id'], self.answers[0].id)
+    
+    def test_paginated_thread_is_oldest_first(self):
+        """Test cursor pagination through a question's answers"""
+        response = self.client.get(f'/api/answers/?question={self.question.id}&page_size=2')
+        self.assertEqual([a['body'] for a in response.data['results']], ['Answer 0', 'Answer 1'])
+        response = self.client.get(response.data['next'])
+        self.assertEqual([a['body'] for a in response.data['results']], ['Answer 2'])
+    
+    def test_single_query_per_page(self):
+        """Test that usernames and question titles come from a JOIN, not per-row queries"""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(f'/api/answers/?question={self.question.id}')
+        self.assertEqual(len(queries.captured_queries), 1)
+    
+    def test_invalid_filter_value(self):
+        """Test that a non-numeric filter is rejected"""
+        response = self.client.get('/api/answers/?question=abc')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,19 +1,45 @@
 from rest_framework import generics, permissions
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from .models import Answer
 from .serializers import AnswerSerializer
+from core.pagination import OptionalCursorPagination
+from core.mixins import MyVoteContextMixin
 
-class AnswerListCreateView(generics.ListCreateAPIView):
-    queryset = Answer.objects.all()
+
+class AnswerCursorPagination(OptionalCursorPagination):
+    # Oldest first inside a thread; served by the (question, created_at) index
+    ordering = ('created_at', 'id')
+
+
+class AnswerListCreateView(MyVoteContextMixin, generics.ListCreateAPIView):
+    """
+    List answers, optionally filtered with ?question=<id> and/or ?user=<id>,
+    or post a new answer. ?page_size= / ?cursor= switch on cursor pagination.
+    """
     serializer_class = AnswerSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = AnswerCursorPagination
+    filter_params = ('question', 'user')
+
+    def get_queryset(self):
+        queryset = Answer.objects.select_related('user', 'question')
+        for param in self.filter_params:
+            value = self.request.query_params.get(param)
+            if value is None:
+                continue
+            try:
+                queryset = queryset.filter(**{f'{param}_id': int(value)})
+            except ValueError:
+                raise ValidationError({param: 'Must be an integer id.'})
+        # Best answer first for unpaginated reads (unchanged behaviour)
+        return queryset.order_by('-is_best_answer', '-created_at', '-id')
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
-class AnswerDetailView(generics.RetrieveUpdateDestroyAPIView):
+class AnswerDetailView(MyVoteContextMixin, generics.RetrieveUpdateDestroyAPIView):
     """Get, update, or delete a specific answer"""
-    queryset = Answer.objects.all()
+    queryset = Answer.objects.select_related('user', 'question')
     serializer_class = AnswerSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     
@@ -13,3 +13,6 @@ python manage.py collectstatic --no-input
 
 # Run migrations
 python manage.py migrate
+
+# Table of the database cache (CACHE_BACKEND=db); a no-op for other backends
+python manage.py createcachetable
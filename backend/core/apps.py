@@ -7,3 +7,11 @@ class CoreConfig(AppConfig):
 
     def ready(self):
         import core.signals
+        import core.checks
+        from core import registry
+
+        # Everything the generic Vote/Comment/Report endpoints accept as `content_type`
+        registry.register('question', 'questions.Question', voteable=True, commentable=True, reportable=True)
+        registry.register('answer', 'answers.Answer', voteable=True, commentable=True, reportable=True)
+        registry.register('comment', 'core.Comment', reportable=True)
+        registry.warm()
@@ -0,0 +1,82 @@
+# core/caching.py
+"""
+Versioned cache namespaces.
+
+Every key in a namespace embeds the namespace's current version, so a single
+bump_namespace() call invalidates all of them at once without having to know
+or delete the individual keys; the stale entries simply expire.
+
+Namespaces in use:
+- 'tags': popular/trending/autocomplete/tag cloud (core.tagging);
+- 'questions': anonymous responses of the question feed, bumped by changes
+  to any question, answer, vote, comment or tag;
+- 'question:<id>': anonymous detail/thread responses of one question, bumped
+  only by changes shown on that question's page.
+Both are bumped together through question_changed(), from core.signals and
+explicitly where QuerySet.update() or raw SQL sends no signal.
+"""
+from django.core.cache import cache
+from django.db import transaction
+
+QUESTIONS_CACHE_NAMESPACE = 'questions'
+
+
+def namespace_version_key(namespace):
+    return f'cache-version:{namespace}'
+
+
+def get_namespace_version(namespace):
+    version = cache.get(namespace_version_key(namespace))
+    if version is None:
+        # add() only sets the key if nobody else did in the meantime
+        cache.add(namespace_version_key(namespace), 1, timeout=None)
+        version = cache.get(namespace_version_key(namespace), 1)
+    return version
+
+
+def bump_namespace(namespace):
+    key = namespace_version_key(namespace)
+    cache.add(key, 1, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, timeout=None)
+
+
+def bump_namespace_on_commit(namespace):
+    """
+    Bump now, for reads later in this transaction, and again once it commits,
+    so that readers who re-cached the old rows in between are invalidated too.
+    """
+    bump_namespace(namespace)
+    transaction.on_commit(lambda: bump_namespace(namespace))
+
+
+def question_cache_namespace(question_id):
+    return f'question:{question_id}'
+
+
+def question_changed(*question_ids):
+    """Invalidate the cached feed and the pages of the given questions (None entries are skipped)"""
+    bump_namespace_on_commit(QUESTIONS_CACHE_NAMESPACE)
+    for question_id in question_ids:
+        if question_id is not None:
+            bump_namespace_on_commit(question_cache_namespace(question_id))
+
+
+def namespace_versions(namespaces):
+    return '.'.join(str(get_namespace_version(namespace)) for namespace in namespaces)
+
+
+def versioned_key(namespace, key):
+    return f'{namespace}:v{get_namespace_version(namespace)}:{key}'
+
+
+def cached(namespace, key, build, timeout):
+    """Return the cached value of key in namespace, calling build() on a miss"""
+    full_key = versioned_key(namespace, key)
+    value = cache.get(full_key)
+    if value is None:
+        value = build()
+        cache.set(full_key, value, timeout)
+    return value
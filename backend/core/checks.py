@@ -0,0 +1,25 @@
+# core/checks.py
+from django.conf import settings
+from django.core.checks import Error, register
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register()
+def check_worker_cache(app_configs, **kwargs):
+    """
+    In 'worker' mode notifications are written by another process, which
+    signals new ones (unread counters, stream versions) through the cache;
+    a per-process cache would never carry that signal to the web process.
+    """
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if getattr(settings, 'NOTIFICATION_DISPATCHER', 'inline') == 'worker' and backend in PROCESS_LOCAL_CACHES:
+        return [Error(
+            "NOTIFICATION_DISPATCHER='worker' needs a cache shared between processes.",
+            hint="Set CACHE_BACKEND to 'file' or 'db' (see settings.py).",
+            id='core.E001',
+        )]
+    return []
@@ -0,0 +1,42 @@
+# core/comments.py
+from collections import defaultdict
+
+
+def build_comment_tree(comments, serialize, max_depth=5, max_children=50):
+    """
+    Assemble a flat, created_at-ordered list of comments (all belonging to the
+    same object) into nested dicts in O(n).
+
+    serialize(comment) turns one comment into a dict; each node additionally
+    gets `depth`, `replies` and `has_more_replies`, set when replies were cut
+    by max_children or by max_depth. Replies whose parent is not in the list
+    are treated as top-level comments.
+    """
+    comments = list(comments)
+    ids = {comment.id for comment in comments}
+    children = defaultdict(list)
+    for comment in comments:
+        parent_id = comment.parent_comment_id if comment.parent_comment_id in ids else None
+        children[parent_id].append(comment)
+
+    # Every direct reply is known now, so counts are exact even where the tree is cut
+    for comment in comments:
+        comment.reply_total = len(children[comment.id])
+
+    def build_level(parent_id, depth):
+        siblings = children[parent_id]
+        nodes = []
+        for comment in siblings[:max_children]:
+            node = serialize(comment)
+            node['depth'] = depth
+            replies = children[comment.id]
+            if depth + 1 < max_depth:
+                node['replies'] = build_level(comment.id, depth + 1)
+                node['has_more_replies'] = len(replies) > max_children
+            else:
+                node['replies'] = []
+                node['has_more_replies'] = bool(replies)
+            nodes.append(node)
+        return nodes
+
+    return build_level(None, 0)
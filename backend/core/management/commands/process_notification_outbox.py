@@ -0,0 +1,35 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from core.notifications import process_outbox
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued notifications from the outbox (run continuously as a worker, or once with --once)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the outbox once and exit')
+        parser.add_argument('--interval', type=float, default=2.0, help='Seconds to sleep when the outbox is empty')
+        parser.add_argument('--batch-size', type=int, default=100, help='Outbox entries per transaction')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Rows per bulk_create INSERT')
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            close_old_connections()
+            try:
+                created = process_outbox(batch_size=options['batch_size'], chunk_size=options['chunk_size'])
+            except Exception as error:
+                self.stderr.write(self.style.ERROR(f"❌ Outbox batch failed: {error}"))
+                created = 0
+                if options['once']:
+                    raise
+
+            total += created
+            if created:
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Delivered {total} notifications"))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from questions.models import Question
+from answers.models import Answer
+from core.voting import rebuild_vote_counters
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the stored upvotes/downvotes/score counters of questions and answers from the Vote table'
+
+    def handle(self, *args, **options):
+        for model_class in (Question, Answer):
+            updated = rebuild_vote_counters(model_class)
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ Rebuilt vote counters for {updated} {model_class._meta.verbose_name_plural}"
+            ))
@@ -0,0 +1,31 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from core.tagging import TRENDING_RETENTION_DAYS, refresh_tag_trends
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the TagDailyUsage rollup behind trending tags (once, or periodically with --interval)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=TRENDING_RETENTION_DAYS,
+                            help='How many recent days to recompute (today included)')
+        parser.add_argument('--interval', type=float, default=None,
+                            help='Keep running and refresh every this many seconds')
+
+    def handle(self, *args, **options):
+        days = max(1, min(options['days'], TRENDING_RETENTION_DAYS))
+        while True:
+            close_old_connections()
+            try:
+                rows = refresh_tag_trends(days=days)
+            except Exception as error:
+                self.stderr.write(self.style.ERROR(f"❌ Tag trend refresh failed: {error}"))
+                if options['interval'] is None:
+                    raise
+            else:
+                self.stdout.write(self.style.SUCCESS(f"✅ Refreshed {rows} tag usage rows over the last {days} days"))
+
+            if options['interval'] is None:
+                break
+            time.sleep(options['interval'])
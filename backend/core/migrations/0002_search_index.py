@@ -0,0 +1,58 @@
+from django.db import migrations
+
+FTS_TABLE = 'core_search_index'
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    Question = apps.get_model('questions', 'Question')
+    Answer = apps.get_model('answers', 'Answer')
+    questions_table = Question._meta.db_table
+    answers_table = Answer._meta.db_table
+
+    if connection.vendor == 'postgresql':
+        # Expression indexes; core.search queries with the very same expressions
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS questions_question_search_idx ON {questions_table} "
+            f"USING GIN (to_tsvector('english', coalesce(title, '') || ' ' || coalesce(body, '')))"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS answers_answer_search_idx ON {answers_table} "
+            f"USING GIN (to_tsvector('english', coalesce(body, '')))"
+        )
+    elif connection.vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "kind UNINDEXED, object_id UNINDEXED, question_id UNINDEXED, title, body, "
+            "tokenize = 'porter unicode61')"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {FTS_TABLE} (kind, object_id, question_id, title, body) "
+            f"SELECT 'question', id, id, title, body FROM {questions_table}"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {FTS_TABLE} (kind, object_id, question_id, title, body) "
+            f"SELECT 'answer', id, question_id, '', body FROM {answers_table}"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS questions_question_search_idx")
+        schema_editor.execute("DROP INDEX IF EXISTS answers_answer_search_idx")
+    elif connection.vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('questions', '0002_vote_counters'),
+        ('answers', '0003_vote_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:46
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('payload', models.JSONField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='notification_type',
+            field=models.CharField(choices=[('question', 'New Question Posted'), ('answer', 'New Answer'), ('comment', 'New Comment'), ('vote', 'New Vote'), ('best_answer', 'Best Answer Selected'), ('mention', 'Mention'), ('follow', 'New Follower'), ('report_resolved', 'Report Resolved')], max_length=20),
+        ),
+    ]
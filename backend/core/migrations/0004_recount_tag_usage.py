@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:12
+
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def recount_tag_usage(apps, schema_editor):
+    """usage_count drifted under the old per-tag save() loops; rebuild it from the through table"""
+    Tag = apps.get_model('core', 'Tag')
+    QuestionTags = apps.get_model('questions', 'Question').tags.through
+
+    usage = (
+        QuestionTags.objects
+        .filter(tag_id=OuterRef('pk'))
+        .order_by()
+        .values('tag_id')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    Tag.objects.update(usage_count=Coalesce(Subquery(usage), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_notification_outbox'),
+        ('questions', '0002_vote_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(recount_tag_usage, migrations.RunPython.noop),
+    ]
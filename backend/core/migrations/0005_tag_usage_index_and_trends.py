@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_recount_tag_usage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagDailyUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('uses', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['-usage_count', 'id'], name='core_tag_usage_idx'),
+        ),
+        migrations.AddField(
+            model_name='tagdailyusage',
+            name='tag',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_usage', to='core.tag'),
+        ),
+        migrations.AddIndex(
+            model_name='tagdailyusage',
+            index=models.Index(fields=['day', 'tag'], name='core_tagdai_day_57d404_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='tagdailyusage',
+            unique_together={('tag', 'day')},
+        ),
+    ]
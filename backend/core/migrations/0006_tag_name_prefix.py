@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:19
+
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+
+def backfill_name_lower(apps, schema_editor):
+    Tag = apps.get_model('core', 'Tag')
+    Tag.objects.update(name_lower=Lower('name'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_tag_usage_index_and_trends'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='name_lower',
+            field=models.CharField(default='', editable=False, max_length=50),
+        ),
+        migrations.RunPython(backfill_name_lower, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['name_lower'], name='core_tag_name_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
@@ -0,0 +1,93 @@
+import hashlib
+import time
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework.response import Response
+from .caching import namespace_versions
+from .voting import user_vote_map
+
+
+class MyVoteContextMixin:
+    """
+    For GET requests by signed-in users, look up the user's votes on every
+    question/answer about to be serialized (including prefetched nested
+    answers) with one query, and pass them to the serializers as
+    context['my_votes'] so they can fill `my_vote` without per-object queries.
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        instance = args[0] if args else kwargs.get('instance')
+        if instance is not None and self.request.method == 'GET':
+            kwargs.setdefault('context', self.get_serializer_context())
+            kwargs['context']['my_votes'] = user_vote_map(self.request.user, self.collect_vote_targets(instance))
+        return super().get_serializer(*args, **kwargs)
+
+    def collect_vote_targets(self, instance):
+        from questions.models import Question
+        from answers.models import Answer
+
+        objects = instance if hasattr(instance, '__iter__') else [instance]
+        targets = {'question': set(), 'answer': set()}
+        for obj in objects:
+            if isinstance(obj, Question):
+                targets['question'].add(obj.pk)
+                # Only look at answers that were prefetched; never trigger a query here
+                for answer in getattr(obj, '_prefetched_objects_cache', {}).get('answers', []):
+                    targets['answer'].add(answer.pk)
+            elif isinstance(obj, Answer):
+                targets['answer'].add(obj.pk)
+        return targets
+
+
+class AnonymousResponseCacheMixin:
+    """
+    Cache successful GET responses for anonymous users, keyed by the absolute
+    URL (query string included), the negotiated format and the versions of
+    response_cache_namespaces (or get_response_cache_namespaces() when they
+    depend on the URL kwargs), so bumping any of them invalidates the entry.
+
+    Responses carry an ETag and Last-Modified; a matching If-None-Match or
+    If-Modified-Since gets a 304. Signed-in users are never served from here.
+    """
+    response_cache_namespaces = ()
+    response_cache_timeout = 60 * 5
+
+    def get(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().get(request, *args, **kwargs)
+
+        key = self.get_response_cache_key(request, *args, **kwargs)
+        entry = cache.get(key)
+        if entry is None:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            entry = {
+                'data': response.data,
+                'etag': f'"{hashlib.md5(key.encode()).hexdigest()}"',
+                'last_modified': int(time.time()),
+            }
+            cache.set(key, entry, self.response_cache_timeout)
+        else:
+            self.response_cache_hit(request, *args, **kwargs)
+
+        response = Response(entry['data'])
+        response['ETag'] = entry['etag']
+        response['Last-Modified'] = http_date(entry['last_modified'])
+        patch_vary_headers(response, ('Authorization', 'Cookie'))
+        return get_conditional_response(
+            request, etag=entry['etag'], last_modified=entry['last_modified'], response=response,
+        )
+
+    def get_response_cache_namespaces(self, request, *args, **kwargs):
+        return self.response_cache_namespaces
+
+    def get_response_cache_key(self, request, *args, **kwargs):
+        versions = namespace_versions(self.get_response_cache_namespaces(request, *args, **kwargs))
+        # Hashed so long query strings fit every backend's key length limit
+        url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+        return f'responses:{versions}:{request.accepted_renderer.format}:{url}'
+
+    def response_cache_hit(self, request, *args, **kwargs):
+        """Called when a cached response is served; the view's own side effects go here"""
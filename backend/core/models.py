@@ -15,17 +15,37 @@ class Tag(models.Model):
     Tags for categorizing questions
     """
     name = models.CharField(max_length=50, unique=True)
+    # Lower-cased copy of name for prefix lookups (autocomplete); kept in sync by save()
+    name_lower = models.CharField(max_length=50, editable=False, default='')
     description = models.TextField(blank=True)
     usage_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Popular tags / tag cloud: ORDER BY usage_count DESC, id
+            models.Index(fields=['-usage_count', 'id'], name='core_tag_usage_idx'),
+            # Autocomplete: LIKE 'prefix%' on PostgreSQL needs the pattern opclass
+            # under non-C collations; other backends use it for range scans
+            models.Index(fields=['name_lower'], name='core_tag_name_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ]
+
     def __str__(self):
         return self.name
     
+    def save(self, *args, **kwargs):
+        self.name_lower = self.name.lower()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'name_lower'}
+        super().save(*args, **kwargs)
+    
     def increment_usage(self):
         """Increment usage count when tag is used"""
-        self.usage_count += 1
-        self.save()
+        from .tagging import tags_changed
+        Tag.objects.filter(pk=self.pk).update(usage_count=models.F('usage_count') + 1)
+        self.refresh_from_db(fields=['usage_count'])
+        tags_changed()
 
 
 # =====================================================
@@ -165,13 +185,54 @@ class Notification(models.Model):
     
     def mark_as_read(self):
         self.is_read = True
-        self.save()
+        self.save(update_fields=['is_read'])
     
     @property
     def is_unread(self):
         return not self.is_read
 
 
+# =====================================================
+# NOTIFICATION OUTBOX
+# =====================================================
+class NotificationOutbox(models.Model):
+    """
+    Notifications waiting to be written by the dispatcher (core.notifications).
+    Each entry holds a batch of Notification field dicts; it is deleted once
+    the batch has been bulk-inserted.
+    """
+    payload = models.JSONField()
+    created_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    
+    class Meta:
+        ordering = ['id']
+    
+    def __str__(self):
+        return f"Outbox entry {self.pk} ({len(self.payload)} notifications)"
+
+
+class TagDailyUsage(models.Model):
+    """
+    Rollup of how many questions were tagged with each tag per day, rebuilt
+    by `manage.py refresh_tag_trends`. Trending tags sum a window of it
+    instead of scanning the question/tag through table.
+    """
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='daily_usage')
+    day = models.DateField()
+    uses = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        unique_together = ('tag', 'day')
+        indexes = [
+            models.Index(fields=['day', 'tag']),
+        ]
+    
+    def __str__(self):
+        return f"{self.tag.name} on {self.day}: {self.uses}"
+
+
 # =====================================================
 # REPORTS MODEL (Generic Foreign Key)
 # =====================================================
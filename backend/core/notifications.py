@@ -0,0 +1,245 @@
+# core/notifications.py
+"""
+Notification delivery and per-user inbox state.
+
+Delivery goes through an outbox: callers hand a batch of notifications to
+dispatch_notifications(), which stores it in NotificationOutbox and, once the
+surrounding transaction commits, hands it to the configured dispatcher
+(settings.NOTIFICATION_DISPATCHER):
+
+- 'inline': write the batch right after commit, in the same thread;
+- 'thread': write it from a background thread of this process (development);
+- 'worker': leave it for `manage.py process_notification_outbox` (production).
+
+The in-process dispatchers drain every pending entry on each handoff, not
+just the new one, so entries whose delivery failed (e.g. SQLite's "database
+is locked" under concurrent writes) are retried with the next notification.
+
+Inbox state is kept in the cache:
+
+- an unread counter, so the navbar badge never has to COUNT the table;
+- a version number, bumped whenever the inbox changes, which the
+  notification stream watches instead of polling the database.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import F
+from .models import Notification, NotificationOutbox
+
+logger = logging.getLogger(__name__)
+
+UNREAD_COUNT_TTL = 60 * 10
+
+
+def unread_count_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def inbox_version_key(user_id):
+    return f'notifications:version:{user_id}'
+
+
+def get_unread_count(user_id):
+    """Return the user's unread notification count, computing it on a cache miss"""
+    key = unread_count_key(user_id)
+    count = cache.get(key)
+    if count is None:
+        # Served by the (user, is_read, created_at) index
+        count = Notification.objects.filter(user_id=user_id, is_read=False).count()
+        cache.set(key, count, UNREAD_COUNT_TTL)
+    return count
+
+
+def inbox_changed(user_ids):
+    """
+    Call after notifications of these users were created, read or deleted.
+    Drops the cached unread counters and wakes up any open streams.
+    """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    cache.delete_many([unread_count_key(user_id) for user_id in user_ids])
+    for user_id in user_ids:
+        key = inbox_version_key(user_id)
+        # add() is a no-op when the key exists, so incr() always has a value to work on
+        cache.add(key, 0, timeout=None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def get_inbox_version(user_id):
+    return cache.get(inbox_version_key(user_id), 0)
+
+
+async def aget_inbox_version(user_id):
+    return await cache.aget(inbox_version_key(user_id), 0)
+
+
+# ==================== DISPATCH ====================
+def notification_payload(user, notification_type, message, actor=None, content_object=None, link=''):
+    """Build the JSON-serializable outbox form of a single Notification"""
+    payload = {
+        'user_id': getattr(user, 'pk', user),
+        'notification_type': notification_type,
+        'message': message,
+        'link': link,
+        'actor_id': getattr(actor, 'pk', actor),
+        'content_type_id': None,
+        'object_id': None,
+    }
+    if content_object is not None:
+        payload['content_type_id'] = ContentType.objects.get_for_model(content_object).pk
+        payload['object_id'] = content_object.pk
+    return payload
+
+
+def dispatch_notifications(payloads):
+    """
+    Queue notifications for delivery. Costs one INSERT on the calling request;
+    the fan-out itself happens after the transaction commits.
+    """
+    payloads = list(payloads)
+    if not payloads:
+        return None
+    entry = NotificationOutbox.objects.create(payload=payloads)
+    transaction.on_commit(lambda: get_dispatcher().handoff(entry.pk))
+    return entry
+
+
+def outbox_max_attempts():
+    return getattr(settings, 'NOTIFICATION_OUTBOX_MAX_ATTEMPTS', 5)
+
+
+def _build_notifications(entries):
+    """
+    Notification objects for the payloads of entries. Recipients deleted since
+    the entry was queued are dropped and vanished actors cleared, so a stale
+    payload cannot fail its foreign keys.
+    """
+    payloads = [payload for entry in entries for payload in entry.payload]
+    user_ids = {payload.get('user_id') for payload in payloads} | {payload.get('actor_id') for payload in payloads}
+    existing = set(get_user_model().objects.filter(pk__in=user_ids - {None}).values_list('pk', flat=True))
+    notifications = []
+    for payload in payloads:
+        if payload.get('user_id') not in existing:
+            continue
+        if payload.get('actor_id') not in existing:
+            payload = {**payload, 'actor_id': None}
+        notifications.append(Notification(**payload))
+    return notifications
+
+
+def _write_entries(entries, chunk_size):
+    with transaction.atomic():
+        notifications = _build_notifications(entries)
+        Notification.objects.bulk_create(notifications, batch_size=chunk_size)
+    return notifications
+
+
+def process_outbox(entry_ids=None, batch_size=100, chunk_size=500):
+    """
+    Write up to batch_size pending outbox entries as notifications, using
+    bulk_create in chunks of chunk_size, and delete the processed entries.
+    Returns the number of notifications created.
+
+    If the batch fails, its entries are retried one by one so a bad entry
+    cannot hold back the others; failing entries get their attempts and
+    last_error recorded and are skipped (dead-lettered, left for inspection)
+    once they reach NOTIFICATION_OUTBOX_MAX_ATTEMPTS.
+    """
+    with transaction.atomic():
+        entries = (
+            NotificationOutbox.objects
+            .select_for_update(skip_locked=True)
+            .filter(attempts__lt=outbox_max_attempts())
+            .order_by('id')
+        )
+        if entry_ids is not None:
+            entries = entries.filter(pk__in=entry_ids)
+        entries = list(entries[:batch_size])
+        if not entries:
+            return 0
+
+        try:
+            notifications = _write_entries(entries, chunk_size)
+            delivered = entries
+        except Exception:
+            logger.warning("Notification outbox batch failed; retrying its %d entries one by one", len(entries))
+            notifications, delivered = [], []
+            for entry in entries:
+                try:
+                    notifications += _write_entries([entry], chunk_size)
+                    delivered.append(entry)
+                except Exception as error:
+                    logger.exception("Failed to deliver notification outbox entry %s", entry.pk)
+                    record_outbox_failure([entry.pk], error)
+        NotificationOutbox.objects.filter(pk__in=[entry.pk for entry in delivered]).delete()
+
+        # bulk_create() sends no post_save, so refresh inbox state ourselves
+        user_ids = {notification.user_id for notification in notifications}
+        transaction.on_commit(lambda: inbox_changed(user_ids))
+    return len(notifications)
+
+
+def record_outbox_failure(entry_ids, error):
+    NotificationOutbox.objects.filter(pk__in=entry_ids).update(
+        attempts=F('attempts') + 1,
+        last_error=str(error)[:1000],
+    )
+
+
+class InlineDispatcher:
+    def handoff(self, entry_id):
+        try:
+            # Everything pending, the new entry included: earlier failures get retried too
+            process_outbox()
+        except Exception as error:
+            # The entry stays in the outbox until the next handoff
+            logger.exception("Failed to deliver notification outbox entry %s", entry_id)
+            record_outbox_failure([entry_id], error)
+
+
+class ThreadPoolDispatcher(InlineDispatcher):
+    # One thread: concurrent drains would only contend for the same entries
+    def __init__(self, max_workers=1):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='notifications')
+
+    def handoff(self, entry_id):
+        self.executor.submit(self._run, entry_id)
+
+    def _run(self, entry_id):
+        try:
+            super().handoff(entry_id)
+        finally:
+            connections.close_all()
+
+
+class WorkerDispatcher:
+    def handoff(self, entry_id):
+        # Picked up by `manage.py process_notification_outbox`
+        pass
+
+
+DISPATCHERS = {
+    'inline': InlineDispatcher,
+    'thread': ThreadPoolDispatcher,
+    'worker': WorkerDispatcher,
+}
+_dispatcher = None
+_dispatcher_name = None
+
+
+def get_dispatcher():
+    global _dispatcher, _dispatcher_name
+    name = getattr(settings, 'NOTIFICATION_DISPATCHER', 'inline')
+    if _dispatcher is None or _dispatcher_name != name:
+        _dispatcher = DISPATCHERS[name]()
+        _dispatcher_name = name
+    return _dispatcher
@@ -0,0 +1,29 @@
+from rest_framework.pagination import CursorPagination
+
+
+class FeedCursorPagination(CursorPagination):
+    """
+    Keyset (cursor) pagination, newest first.
+    Ordering must end in a unique column so the cursor position is stable.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+
+class OptionalCursorPagination(FeedCursorPagination):
+    """
+    FeedCursorPagination that is only engaged when the client asks for it
+    with ?page_size= or ?cursor=, so existing clients keep getting plain lists.
+    The `next`/`previous` links carry both parameters forward.
+    """
+
+    def is_requested(self, request):
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+        return super().paginate_queryset(queryset, request, view)
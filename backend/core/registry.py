@@ -0,0 +1,91 @@
+# core/registry.py
+"""
+The models reachable through the generic Vote, Comment and Report relations,
+keyed by the public name clients send as `content_type` ('question', ...).
+
+Kinds are registered once, in CoreConfig.ready(). Views resolve the name with
+get_kind() instead of importing models per request; the ContentType row is
+looked up through ContentType.objects' process-wide cache, so after the first
+request per kind no lookup touches the database.
+"""
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+
+VOTEABLE = 'voteable'
+COMMENTABLE = 'commentable'
+REPORTABLE = 'reportable'
+
+
+class ContentKind:
+    def __init__(self, name, model_label, capabilities):
+        self.name = name
+        self.model_label = model_label
+        self.capabilities = frozenset(capabilities)
+        self.model = None
+
+    def resolve(self):
+        if self.model is None:
+            self.model = apps.get_model(self.model_label)
+        return self.model
+
+    @property
+    def content_type(self):
+        return ContentType.objects.get_for_model(self.resolve())
+
+    @property
+    def content_type_id(self):
+        return self.content_type.pk
+
+    @property
+    def label(self):
+        return self.resolve()._meta.verbose_name.capitalize()
+
+    def exists(self, object_id):
+        return self.resolve().objects.filter(pk=object_id).exists()
+
+    def __repr__(self):
+        return f'<ContentKind {self.name}: {self.model_label}>'
+
+
+_kinds = {}
+
+
+def register(name, model_label, voteable=False, commentable=False, reportable=False):
+    """Make model_label ('app_label.Model') reachable under name for the given relations"""
+    capabilities = set()
+    if voteable:
+        capabilities.add(VOTEABLE)
+    if commentable:
+        capabilities.add(COMMENTABLE)
+    if reportable:
+        capabilities.add(REPORTABLE)
+    kind = ContentKind(name, model_label, capabilities)
+    _kinds[name] = kind
+    return kind
+
+
+def get_kind(name, capability=None):
+    """Return the ContentKind registered as name (with capability, if given), or None"""
+    kind = _kinds.get(name)
+    if kind is None or (capability is not None and capability not in kind.capabilities):
+        return None
+    return kind
+
+
+def kind_names(capability):
+    return [name for name, kind in _kinds.items() if capability in kind.capabilities]
+
+
+def question_id_of(content_type_id, object_id):
+    """Id of the question whose page shows the object: the question itself, or an answer's question"""
+    if content_type_id == get_kind('question').content_type_id:
+        return object_id
+    if content_type_id == get_kind('answer').content_type_id:
+        return get_kind('answer').resolve().objects.filter(pk=object_id).values_list('question_id', flat=True).first()
+    return None
+
+
+def warm():
+    """Resolve every registered model class. ContentType ids are left to the first request."""
+    for kind in _kinds.values():
+        kind.resolve()
@@ -0,0 +1,18 @@
+import json
+from rest_framework.renderers import BaseRenderer
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets DRF negotiate `Accept: text/event-stream` for Server-Sent Events views.
+    Streaming views return their own StreamingHttpResponse; this renderer only
+    ever formats error payloads (e.g. authentication failures).
+    """
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return f"event: error\ndata: {json.dumps(data)}\n\n".encode(self.charset)
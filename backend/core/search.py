@@ -0,0 +1,185 @@
+# core/search.py
+"""
+Full-text search over questions and answers.
+
+PostgreSQL: queries the tables directly through GIN expression indexes on
+to_tsvector(...) (created in core/migrations/0002_search_index.py), so no
+extra bookkeeping is needed.
+
+SQLite (dev/test): a FTS5 virtual table, core_search_index, mirrors the
+searchable text and is kept in sync by the receivers in core/signals.py.
+"""
+import re
+from django.db import connection
+from django.utils.html import escape
+
+FTS_TABLE = 'core_search_index'
+TS_CONFIG = 'english'
+
+# Sentinels wrapped around matches by the database, swapped for <mark> tags
+# only after the snippet has been HTML-escaped.
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_STOP = '\x03'
+
+QUESTION = 'question'
+ANSWER = 'answer'
+
+
+def uses_fts5():
+    return connection.vendor == 'sqlite'
+
+
+# ==================== INDEX MAINTENANCE (SQLite) ====================
+def _replace_row(kind, object_id, question_id, title, body):
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE kind = %s AND object_id = %s", [kind, object_id])
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (kind, object_id, question_id, title, body) VALUES (%s, %s, %s, %s, %s)",
+            [kind, object_id, question_id, title, body],
+        )
+
+
+def index_question(question):
+    if uses_fts5():
+        _replace_row(QUESTION, question.pk, question.pk, question.title, question.body)
+
+
+def index_answer(answer):
+    if uses_fts5():
+        _replace_row(ANSWER, answer.pk, answer.question_id, '', answer.body)
+
+
+def remove_from_index(kind, object_id):
+    if uses_fts5():
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE kind = %s AND object_id = %s", [kind, object_id])
+
+
+# ==================== QUERYING ====================
+def _fts5_match_expression(query):
+    """
+    Turn free text into a safe FTS5 expression: every word is quoted (so
+    operators in user input are inert) and the last one is prefix-matched.
+    """
+    words = re.findall(r'\w+', query)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def _search_fts5(query, limit, offset):
+    match = _fts5_match_expression(query)
+    if match is None:
+        return []
+    with connection.cursor() as cursor:
+        # bm25() weights follow the column order: kind, object_id, question_id, title, body
+        cursor.execute(
+            f"""
+            SELECT kind, object_id, question_id,
+                   bm25({FTS_TABLE}, 0.0, 0.0, 0.0, 10.0, 1.0) AS rank,
+                   snippet({FTS_TABLE}, -1, %s, %s, '…', 16) AS snippet
+            FROM {FTS_TABLE}
+            WHERE {FTS_TABLE} MATCH %s
+            ORDER BY rank
+            LIMIT %s OFFSET %s
+            """,
+            [HIGHLIGHT_START, HIGHLIGHT_STOP, match, limit, offset],
+        )
+        rows = cursor.fetchall()
+
+    from questions.models import Question
+    titles = dict(
+        Question.objects.filter(pk__in={row[2] for row in rows}).values_list('pk', 'title')
+    )
+    # bm25() is "lower is better"; flip it so both backends rank descending
+    return [
+        {
+            'type': kind,
+            'id': int(object_id),
+            'question_id': int(question_id),
+            'title': titles.get(int(question_id), ''),
+            'snippet': snippet,
+            'rank': -rank,
+        }
+        for kind, object_id, question_id, rank, snippet in rows
+    ]
+
+
+def _search_postgres(query, limit, offset):
+    from questions.models import Question
+    from answers.models import Answer
+    questions_table = Question._meta.db_table
+    answers_table = Answer._meta.db_table
+    headline_options = f'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxWords=35, MinWords=15'
+
+    # The WHERE expressions must match the GIN index expressions exactly.
+    # Headlines are only computed for the rows of the requested page.
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            WITH search AS (SELECT websearch_to_tsquery(%s, %s) AS query),
+            hits AS (
+                SELECT 'question' AS kind, q.id AS object_id, q.id AS question_id, q.title, q.body,
+                       ts_rank(setweight(to_tsvector(%s, coalesce(q.title, '')), 'A') ||
+                               setweight(to_tsvector(%s, coalesce(q.body, '')), 'B'), search.query) AS rank
+                FROM {questions_table} q, search
+                WHERE to_tsvector('{TS_CONFIG}', coalesce(q.title, '') || ' ' || coalesce(q.body, '')) @@ search.query
+                UNION ALL
+                SELECT 'answer', a.id, a.question_id, q.title, a.body,
+                       ts_rank(setweight(to_tsvector(%s, coalesce(a.body, '')), 'B'), search.query)
+                FROM {answers_table} a
+                JOIN {questions_table} q ON q.id = a.question_id, search
+                WHERE to_tsvector('{TS_CONFIG}', coalesce(a.body, '')) @@ search.query
+                ORDER BY rank DESC, object_id DESC
+                LIMIT %s OFFSET %s
+            )
+            SELECT hits.kind, hits.object_id, hits.question_id, hits.title, hits.rank,
+                   ts_headline(%s, hits.body, search.query, %s)
+            FROM hits, search
+            ORDER BY hits.rank DESC, hits.object_id DESC
+            """,
+            [TS_CONFIG, query, TS_CONFIG, TS_CONFIG, TS_CONFIG, limit, offset, TS_CONFIG, headline_options],
+        )
+        rows = cursor.fetchall()
+
+    return [
+        {
+            'type': kind,
+            'id': object_id,
+            'question_id': question_id,
+            'title': title,
+            'snippet': snippet,
+            'rank': rank,
+        }
+        for kind, object_id, question_id, title, rank, snippet in rows
+    ]
+
+
+def _highlight(snippet):
+    return (
+        escape(snippet)
+        .replace(HIGHLIGHT_START, '<mark>')
+        .replace(HIGHLIGHT_STOP, '</mark>')
+    )
+
+
+def search(query, limit=20, offset=0):
+    """
+    Return up to `limit` ranked hits for `query`, best first. Each hit is a
+    dict with type, id, question_id, title, an HTML-safe snippet where
+    matches are wrapped in <mark>, and the backend's rank.
+    """
+    query = (query or '').strip()
+    if not query:
+        return []
+
+    if connection.vendor == 'postgresql':
+        results = _search_postgres(query, limit, offset)
+    else:
+        results = _search_fts5(query, limit, offset)
+
+    for result in results:
+        result['snippet'] = _highlight(result['snippet'] or '')
+    return results
@@ -2,6 +2,21 @@ from rest_framework import serializers
 from .models import Notification, Tag, Vote, Comment, Report
 from django.contrib.contenttypes.models import ContentType
 
+class MyVoteField(serializers.Field):
+    """
+    The requesting user's vote ('up', 'down' or None) on the object, read from
+    the context['my_votes'] map prepared by MyVoteContextMixin.
+    Never queries; without the map it is always None.
+    """
+    def __init__(self, kind, **kwargs):
+        self.kind = kind
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, obj):
+        return self.context.get('my_votes', {}).get(self.kind, {}).get(obj.pk)
+
 class NotificationSerializer(serializers.ModelSerializer):
     actor_username = serializers.CharField(source='actor.username', read_only=True)
     
@@ -35,6 +50,10 @@ class CommentSerializer(serializers.ModelSerializer):
         read_only_fields = ['user', 'created_at', 'updated_at', 'is_edited', 'username']
     
     def get_replies_count(self, obj):
+        # Views annotate or precompute reply_total to avoid a COUNT per comment
+        reply_total = getattr(obj, 'reply_total', None)
+        if reply_total is not None:
+            return reply_total
         return obj.replies.count()
 
 class ReportSerializer(serializers.ModelSerializer):
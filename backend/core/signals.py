@@ -1,7 +1,13 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, pre_delete
 from django.dispatch import receiver
+from django.contrib.contenttypes.models import ContentType
 from answers.models import Answer
-from core.models import Notification
+from core.models import Comment, Notification, Tag, Vote
+from core.caching import question_changed
+from core import registry, search
+from core.voting import apply_vote_change
+from core.tagging import release_tags, tags_changed
+from core.notifications import inbox_changed, dispatch_notifications, notification_payload
 from questions.models import Question
 
 @receiver(post_save, sender=Answer)
@@ -13,17 +19,18 @@ def notify_question_author(sender, instance, created, **kwargs):
     if created:
         question = instance.question
         answer_author = instance.user
-        question_author = question.user
 
         # Don't notify if you answer your own question
-        if answer_author != question_author:
-            Notification.objects.create(
-                user=question_author,
-                notification_type='answer',
-                message=f"{answer_author.username} answered your question: {question.title[:30]}...",
-                actor=answer_author,
-                content_object=instance # Link to the specific answer
-            )
+        if instance.user_id != question.user_id:
+            dispatch_notifications([
+                notification_payload(
+                    user=question.user_id,
+                    notification_type='answer',
+                    message=f"{answer_author.username} answered your question: {question.title[:30]}...",
+                    actor=answer_author,
+                    content_object=instance # Link to the specific answer
+                )
+            ])
 
 @receiver(post_save, sender=Question)
 def notify_question_created(sender, instance, created, **kwargs):
@@ -31,9 +38,110 @@ def notify_question_created(sender, instance, created, **kwargs):
     Action: Notifies the author that their question was posted successfully.
     """
     if created:
-        Notification.objects.create(
-            user=instance.user,
-            notification_type='question',
-            message=f"Your question '{instance.title[:30]}...' was posted successfully!",
-            content_object=instance
-        )
+        dispatch_notifications([
+            notification_payload(
+                user=instance.user_id,
+                notification_type='question',
+                message=f"Your question '{instance.title[:30]}...' was posted successfully!",
+                content_object=instance
+            )
+        ])
+
+
+# ==================== INBOX STATE ====================
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def notification_inbox_changed(sender, instance, **kwargs):
+    """Invalidate the unread counter and wake the user's notification stream"""
+    inbox_changed([instance.user_id])
+
+
+# ==================== SEARCH INDEX SYNC ====================
+@receiver(post_save, sender=Question)
+def index_question(sender, instance, **kwargs):
+    search.index_question(instance)
+
+@receiver(post_save, sender=Answer)
+def index_answer(sender, instance, **kwargs):
+    search.index_answer(instance)
+
+@receiver(post_delete, sender=Question)
+def unindex_question(sender, instance, **kwargs):
+    search.remove_from_index(search.QUESTION, instance.pk)
+
+@receiver(post_delete, sender=Answer)
+def unindex_answer(sender, instance, **kwargs):
+    search.remove_from_index(search.ANSWER, instance.pk)
+
+
+# ==================== REPUTATION ====================
+@receiver(pre_delete, sender=Vote)
+def revoke_vote(sender, instance, **kwargs):
+    """
+    Take back the counters and reputation of a vote deleted outside toggle_vote():
+    admin deletes, voter accounts deleted, and the votes cascaded away with a
+    deleted question or answer (so their owner loses the reputation they earned).
+    pre_delete, because in a cascade the voted row may be deleted before the vote.
+    """
+    content_type = ContentType.objects.get_for_id(instance.content_type_id)  # cached, unlike instance.content_type
+    apply_vote_change(content_type, instance.object_id, old_type=instance.vote_type)
+
+
+# ==================== TAG USAGE ====================
+@receiver(pre_delete, sender=Question)
+def release_question_tags(sender, instance, **kwargs):
+    """The through rows are about to be cascaded away; give the tags their usage back"""
+    release_tags(list(instance.tags.through.objects.filter(question_id=instance.pk).values_list('tag_id', flat=True)))
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tag_caches(sender, instance, **kwargs):
+    tags_changed()
+
+
+# ==================== QUESTION ACTIVITY ====================
+@receiver(post_save, sender=Answer)
+def answer_activity(sender, instance, created, **kwargs):
+    if created:
+        Question.objects.filter(pk=instance.question_id).update(last_activity_at=instance.created_at)
+
+@receiver(post_save, sender=Comment)
+def comment_activity(sender, instance, created, **kwargs):
+    """A comment on a question, or on one of its answers, is activity on the question"""
+    if not created:
+        return
+    if instance.content_type_id == registry.get_kind('question').content_type_id:
+        questions = Question.objects.filter(pk=instance.object_id)
+    elif instance.content_type_id == registry.get_kind('answer').content_type_id:
+        questions = Question.objects.filter(answers=instance.object_id)
+    else:
+        return
+    questions.update(last_activity_at=instance.created_at)
+
+
+# ==================== RESPONSE CACHE ====================
+# Each change invalidates the cached feed and the page of the question it is shown on
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def invalidate_question_page(sender, instance, **kwargs):
+    question_changed(instance.pk)
+
+@receiver(post_save, sender=Answer)
+@receiver(post_delete, sender=Answer)
+def invalidate_answer_question_page(sender, instance, **kwargs):
+    question_changed(instance.question_id)
+
+@receiver(post_save, sender=Vote)
+@receiver(post_delete, sender=Vote)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_target_question_page(sender, instance, **kwargs):
+    # None once the target answer is gone; its own post_delete covered the page
+    question_changed(registry.question_id_of(instance.content_type_id, instance.object_id))
+
+@receiver(post_save, sender=Tag)
+@receiver(pre_delete, sender=Tag)
+def invalidate_tagged_question_pages(sender, instance, **kwargs):
+    """A renamed or deleted tag changes tag_names on every question carrying it"""
+    question_changed(*Question.objects.filter(tags=instance).values_list('pk', flat=True))
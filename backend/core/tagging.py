@@ -0,0 +1,195 @@
+# core/tagging.py
+"""
+Attaching tags to questions while keeping Tag.usage_count in step.
+
+usage_count is the number of questions carrying the tag. It is only ever
+shifted with F() expressions, once per statement for the whole set of tags,
+so concurrent writers cannot lose updates and the cost of tagging a question
+does not grow with the number of tags.
+
+Popular and trending tags are read on every page view (sidebar), so they are
+served from the 'tags' cache namespace, which is bumped whenever usage changes.
+Trending tags come from the TagDailyUsage rollup, rebuilt periodically by
+`manage.py refresh_tag_trends`.
+"""
+from datetime import datetime, time, timedelta
+from django.db import connection, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from .caching import bump_namespace_on_commit, cached, question_changed
+from .models import Tag, TagDailyUsage
+
+TAGS_CACHE_NAMESPACE = 'tags'
+TAGS_CACHE_TTL = 60 * 5
+
+# Trending windows offered by the API, in days; the rollup keeps the longest
+TRENDING_WINDOWS = (7, 30)
+TRENDING_RETENTION_DAYS = max(TRENDING_WINDOWS)
+
+
+def normalize_tag_names(names):
+    """Lower-case, strip and de-duplicate tag names, keeping their order"""
+    seen = []
+    for name in names:
+        name = (name or '').strip().lower()
+        if name and name not in seen:
+            seen.append(name)
+    return seen
+
+
+def _through(question):
+    return question.tags.through
+
+
+def _forget_prefetched_tags(question):
+    # The writes below bypass the related manager, so drop any stale prefetch
+    getattr(question, '_prefetched_objects_cache', {}).pop('tags', None)
+
+
+def add_tags(question, names):
+    """
+    Attach the named tags to question, creating the missing ones.
+    Costs a constant number of queries whatever the number of tags.
+    """
+    names = normalize_tag_names(names)
+    if not names:
+        return
+    through = _through(question)
+    with transaction.atomic():
+        # bulk_create() skips save(), so fill the prefix column here
+        Tag.objects.bulk_create([Tag(name=name, name_lower=name) for name in names], ignore_conflicts=True)
+        tag_ids = set(Tag.objects.filter(name__in=names).values_list('id', flat=True))
+        tag_ids -= set(
+            through.objects.filter(question_id=question.pk, tag_id__in=tag_ids).values_list('tag_id', flat=True)
+        )
+        if tag_ids:
+            through.objects.bulk_create([through(question_id=question.pk, tag_id=tag_id) for tag_id in tag_ids])
+            Tag.objects.filter(pk__in=tag_ids).update(usage_count=F('usage_count') + 1)
+            question_tags_changed(question.pk)
+    _forget_prefetched_tags(question)
+
+
+def remove_tags(question, tag_ids):
+    """Detach the given tags from question and decrement their usage"""
+    tag_ids = set(tag_ids)
+    if not tag_ids:
+        return
+    with transaction.atomic():
+        removed = list(
+            _through(question).objects.filter(question_id=question.pk, tag_id__in=tag_ids).values_list('tag_id', flat=True)
+        )
+        _through(question).objects.filter(question_id=question.pk, tag_id__in=removed).delete()
+        release_tags(removed)
+        question_tags_changed(question.pk)
+    _forget_prefetched_tags(question)
+
+
+def set_tags(question, names):
+    """Make question carry exactly the named tags"""
+    names = normalize_tag_names(names)
+    current = dict(
+        _through(question).objects.filter(question_id=question.pk).values_list('tag__name', 'tag_id')
+    )
+    with transaction.atomic():
+        remove_tags(question, [tag_id for name, tag_id in current.items() if name not in names])
+        add_tags(question, [name for name in names if name not in current])
+
+
+def release_tags(tag_ids):
+    """Decrement usage_count of the given tags, never below zero"""
+    if tag_ids:
+        Tag.objects.filter(pk__in=tag_ids, usage_count__gt=0).update(usage_count=F('usage_count') - 1)
+        tags_changed()
+
+
+def tags_changed():
+    """Invalidate the cached popular/trending/tag cloud responses once the change is committed"""
+    bump_namespace_on_commit(TAGS_CACHE_NAMESPACE)
+
+
+def question_tags_changed(question_id):
+    # Through-table writes send no signals, but tag_names on the feed and the question's page changed
+    question_changed(question_id)
+    tags_changed()
+
+
+# ==================== POPULAR & TRENDING ====================
+def popular_tags(limit=5):
+    """The `limit` most used tags as [{id, name, count}], served from the cache"""
+    def build():
+        rows = Tag.objects.order_by('-usage_count', 'id').values_list('id', 'name', 'usage_count')[:limit]
+        return [{'id': tag_id, 'name': name, 'count': count} for tag_id, name, count in rows]
+    return cached(TAGS_CACHE_NAMESPACE, f'popular:{limit}', build, TAGS_CACHE_TTL)
+
+
+def trending_tags(days, limit=10):
+    """
+    The tags most used on questions asked in the last `days` days, as
+    [{id, name, count}], summed from the TagDailyUsage rollup.
+    """
+    def build():
+        since = timezone.localdate() - timedelta(days=days - 1)
+        rows = (
+            TagDailyUsage.objects
+            .filter(day__gte=since)
+            .values('tag_id', 'tag__name')
+            .annotate(count=Sum('uses'))
+            .order_by('-count', 'tag__name')
+            .values_list('tag_id', 'tag__name', 'count')[:limit]
+        )
+        return [{'id': tag_id, 'name': name, 'count': count} for tag_id, name, count in rows]
+    return cached(TAGS_CACHE_NAMESPACE, f'trending:{days}:{limit}', build, TAGS_CACHE_TTL)
+
+
+def autocomplete_tags(prefix, limit=10):
+    """
+    The `limit` most used tags whose name starts with prefix (case-insensitive),
+    as [{id, name, count}]. Answered from the name_lower index and cached per
+    prefix in the 'tags' namespace.
+    """
+    prefix = prefix.strip().lower()
+    if not prefix:
+        return []
+
+    def build():
+        if connection.vendor == 'postgresql':
+            # LIKE 'prefix%' through the varchar_pattern_ops index
+            matches = Tag.objects.filter(name_lower__startswith=prefix)
+        else:
+            # SQLite's LIKE is case-insensitive and cannot use a plain index; a
+            # range over the lower-cased column can
+            matches = Tag.objects.filter(name_lower__gte=prefix, name_lower__lt=prefix + '\U0010ffff')
+        rows = matches.order_by('-usage_count', 'name_lower').values_list('id', 'name', 'usage_count')[:limit]
+        return [{'id': tag_id, 'name': name, 'count': count} for tag_id, name, count in rows]
+    return cached(TAGS_CACHE_NAMESPACE, f'autocomplete:{limit}:{prefix}', build, TAGS_CACHE_TTL)
+
+
+def refresh_tag_trends(days=TRENDING_RETENTION_DAYS):
+    """
+    Recompute the TagDailyUsage rows of the last `days` days (today included)
+    from the question/tag through table in one grouped query, and drop rows
+    older than the longest trending window. Returns the number of rows written.
+    """
+    from questions.models import Question
+    QuestionTags = Question.tags.through
+
+    today = timezone.localdate()
+    start = today - timedelta(days=days - 1)
+    start_at = timezone.make_aware(datetime.combine(start, time.min))
+    counts = (
+        QuestionTags.objects
+        .filter(question__created_at__gte=start_at)
+        .annotate(day=TruncDate('question__created_at'))
+        .values('tag_id', 'day')
+        .annotate(uses=Count('id'))
+        .order_by()
+    )
+
+    with transaction.atomic():
+        rows = [TagDailyUsage(tag_id=row['tag_id'], day=row['day'], uses=row['uses']) for row in counts]
+        TagDailyUsage.objects.filter(day__gte=start).delete()
+        TagDailyUsage.objects.filter(day__lt=today - timedelta(days=TRENDING_RETENTION_DAYS - 1)).delete()
+        TagDailyUsage.objects.bulk_create(rows, batch_size=500)
+        tags_changed()
+    return len(rows)
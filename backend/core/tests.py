@@ -1,11 +1,24 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
 from questions.models import Question
 from answers.models import Answer
-from core.models import Vote, Comment, Report, Tag
+from core.models import Vote, Comment, Report, Tag, TagDailyUsage, Notification, NotificationOutbox
+from core.notifications import notification_payload, process_outbox
+from core.voting import _insert_vote_if_absent, toggle_vote
+from core import registry
+from core.views import NotificationStreamView
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+from datetime import timedelta
+from django.db import OperationalError, connection
+from django.test.utils import CaptureQueriesContext
+from io import StringIO
+from asgiref.sync import async_to_sync
+from unittest.mock import patch
 
 User = get_user_model()
 
@@ -109,6 +122,139 @@ class VotingAPITestCase(TestCase):
         response = self.client.get(f'/api/votes/list/?content_type=question&object_id={self.question.id}')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 1)
+    
+    def test_vote_updates_stored_counters(self):
+        """Test that creating, changing and removing a vote keeps counters in sync"""
+        url_data = {'content_type': 'question', 'object_id': self.question.id}
+        self.client.post('/api/votes/', {'vote_type': 'up', **url_data})
+        self.question.refresh_from_db()
+        self.assertEqual((self.question.upvotes, self.question.downvotes, self.question.score), (1, 0, 1))
+        
+        self.client.post('/api/votes/', {'vote_type': 'down', **url_data})
+        self.question.refresh_from_db()
+        self.assertEqual((self.question.upvotes, self.question.downvotes, self.question.score), (0, 1, -1))
+        
+        self.client.post('/api/votes/', {'vote_type': 'down', **url_data})
+        self.question.refresh_from_db()
+        self.assertEqual((self.question.upvotes, self.question.downvotes, self.question.score), (0, 0, 0))
+    
+    def test_answer_vote_updates_stored_counters(self):
+        """Test that votes on answers update the answer counters"""
+        answer = Answer.objects.create(question=self.question, body='Answer', user=self.user2)
+        self.client.post('/api/votes/', {
+            'vote_type': 'up',
+            'content_type': 'answer',
+            'object_id': answer.id
+        })
+        answer.refresh_from_db()
+        self.assertEqual(answer.score, 1)
+        self.assertEqual(answer.vote_count(), 1)
+    
+    def test_vote_response_includes_score(self):
+        """Test that the vote response carries the updated counters"""
+        response = self.client.post('/api/votes/', {'vote_type': 'up', 'content_type': 'question', 'object_id': self.question.id})
+        self.assertEqual((response.data['upvotes'], response.data['downvotes'], response.data['score']), (1, 0, 1))
+        response = self.client.post('/api/votes/', {'vote_type': 'down', 'content_type': 'question', 'object_id': self.question.id})
+        self.assertEqual(response.data['score'], -1)
+    
+    def test_vote_on_missing_object(self):
+        """Test voting on a missing object returns 404 and a bad id returns 400"""
+        response = self.client.post('/api/votes/', {'vote_type': 'up', 'content_type': 'question', 'object_id': 99999})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.post('/api/votes/', {'vote_type': 'up', 'content_type': 'question', 'object_id': 'abc'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Vote.objects.count(), 0)
+    
+    def test_toggle_vote_never_duplicates(self):
+        """Test that an insert racing an existing vote is a no-op and the toggle still applies"""
+        content_type = ContentType.objects.get_for_model(Question)
+        action, counters = toggle_vote(self.user, content_type, self.question.id, 'up')
+        self.assertEqual((action, counters['score']), ('created', 1))
+        self.assertFalse(_insert_vote_if_absent(self.user, content_type, self.question.id, 'up'))
+        self.assertEqual(Vote.objects.count(), 1)
+        
+        action, counters = toggle_vote(self.user, content_type, self.question.id, 'down')
+        self.assertEqual((action, counters['upvotes'], counters['downvotes']), ('changed', 0, 1))
+        self.assertEqual(Vote.objects.get().vote_type, 'down')
+    
+    def test_raw_insert_stores_timestamps_like_the_orm(self):
+        """Test that toggle-created and ORM-created votes store the timestamp in the same format"""
+        toggle_vote(self.user, ContentType.objects.get_for_model(Question), self.question.id, 'up')
+        Vote.objects.create(user=self.user2, vote_type='up',
+                            content_type=ContentType.objects.get_for_model(Question), object_id=self.question.id)
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT CAST(timestamp AS TEXT) FROM {Vote._meta.db_table} ORDER BY id')
+            raw, orm = [row[0] for row in cursor.fetchall()]
+        self.assertEqual(raw.endswith('+00:00'), orm.endswith('+00:00'))
+        self.assertEqual(len(raw), len(orm))
+        self.assertIsNotNone(Vote.objects.get(user=self.user).timestamp)
+    
+    def test_vote_summary(self):
+        """Test that the summary mode returns counts and the caller's vote"""
+        self.client.post('/api/votes/', {'vote_type': 'up', 'content_type': 'question', 'object_id': self.question.id})
+        self.client.force_authenticate(user=self.user2)
+        self.client.post('/api/votes/', {'vote_type': 'down', 'content_type': 'question', 'object_id': self.question.id})
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                f'/api/votes/list/?content_type=question&object_id={self.question.id}&summary=true'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'up': 1, 'down': 1, 'score': 0, 'my_vote': 'down'})
+        self.assertEqual(len(queries.captured_queries), 2)
+        self.assertFalse(any('COUNT' in q['sql'] for q in queries.captured_queries))
+    
+    def test_vote_summary_anonymous_and_missing(self):
+        """Test summary for anonymous users and for unknown objects"""
+        self.client.force_authenticate(user=None)
+        response = self.client.get(f'/api/votes/list/?content_type=question&object_id={self.question.id}&summary=true')
+        self.assertIsNone(response.data['my_vote'])
+        response = self.client.get('/api/votes/list/?content_type=question&object_id=999999&summary=true')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+    
+    def test_raw_vote_list_paginated(self):
+        """Test that the raw vote list can be paged through"""
+        question_ct = ContentType.objects.get_for_model(Question)
+        Vote.objects.create(user=self.user, vote_type='up', content_type=question_ct, object_id=self.question.id)
+        Vote.objects.create(user=self.user2, vote_type='up', content_type=question_ct, object_id=self.question.id)
+        response = self.client.get(f'/api/votes/list/?content_type=question&object_id={self.question.id}&page_size=1')
+        self.assertEqual(len(response.data['results']), 1)
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNone(response.data['next'])
+    
+    def test_my_votes_batch_lookup(self):
+        """Test that the user's votes on many objects come back from one query"""
+        other_question = Question.objects.create(title='Other', body='Body', user=self.user2)
+        answer = Answer.objects.create(question=self.question, body='Answer', user=self.user2)
+        self.client.post('/api/votes/', {'vote_type': 'up', 'content_type': 'question', 'object_id': self.question.id})
+        self.client.post('/api/votes/', {'vote_type': 'down', 'content_type': 'answer', 'object_id': answer.id})
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                f'/api/votes/mine/?questions={self.question.id},{other_question.id}&answers={answer.id}'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['questions'], {self.question.id: 'up'})
+        self.assertEqual(response.data['answers'], {answer.id: 'down'})
+        self.assertEqual(len(queries.captured_queries), 1)
+    
+    def test_my_votes_rejects_bad_ids(self):
+        """Test that malformed id lists are rejected"""
+        response = self.client.get('/api/votes/mine/?questions=1,abc')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_rebuild_vote_counts_command(self):
+        """Test that the rebuild command recomputes counters from the Vote table"""
+        question_ct = ContentType.objects.get_for_model(Question)
+        Vote.objects.create(user=self.user, vote_type='up', content_type=question_ct, object_id=self.question.id)
+        Vote.objects.create(user=self.user2, vote_type='down', content_type=question_ct, object_id=self.question.id)
+        Question.objects.filter(pk=self.question.pk).update(upvotes=7, downvotes=0, score=7)
+        
+        call_command('rebuild_vote_counts', stdout=StringIO())
+        
+        self.question.refresh_from_db()
+        self.assertEqual((self.question.upvotes, self.question.downvotes, self.question.score), (1, 1, 0))
 
 
 class CommentAPITestCase(TestCase):
@@ -198,6 +344,85 @@ class CommentAPITestCase(TestCase):
         self.assertEqual(Comment.objects.count(), 0)
 
 
+class CommentTreeTestCase(TestCase):
+    """Test cases for the threaded comment tree loader"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.question = Question.objects.create(title='Test Question', body='Test body', user=self.user)
+        self.question_ct = ContentType.objects.get_for_model(Question)
+    
+    def comment(self, content, parent=None):
+        return Comment.objects.create(
+            user=self.user,
+            content=content,
+            content_type=self.question_ct,
+            object_id=self.question.id,
+            parent_comment=parent
+        )
+    
+    def tree_url(self, **params):
+        query = '&'.join(f'{key}={value}' for key, value in params.items())
+        return f'/api/comments/?content_type=question&object_id={self.question.id}&tree=true&{query}'
+    
+    def test_tree_nests_replies(self):
+        """Test that replies are nested under their parents with depth and counts"""
+        root = self.comment('root')
+        reply = self.comment('reply', parent=root)
+        self.comment('nested', parent=reply)
+        self.comment('second root')
+        
+        response = self.client.get(self.tree_url())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([node['content'] for node in response.data], ['root', 'second root'])
+        root_node = response.data[0]
+        self.assertEqual(root_node['replies_count'], 1)
+        self.assertEqual(root_node['replies'][0]['content'], 'reply')
+        self.assertEqual(root_node['replies'][0]['depth'], 1)
+        self.assertEqual(root_node['replies'][0]['replies'][0]['content'], 'nested')
+    
+    def test_tree_uses_single_query(self):
+        """Test that the whole thread is loaded with one query regardless of size"""
+        parent = None
+        for i in range(10):
+            parent = self.comment(f'level {i}', parent=parent)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.tree_url(max_depth=10))
+        self.assertEqual(len(queries.captured_queries), 1)
+    
+    def test_tree_depth_and_children_limits(self):
+        """Test that max_depth and max_children cut the tree and flag it"""
+        root = self.comment('root')
+        for i in range(3):
+            reply = self.comment(f'reply {i}', parent=root)
+        self.comment('too deep', parent=reply)
+        
+        response = self.client.get(self.tree_url(max_depth=2, max_children=2))
+        root_node = response.data[0]
+        self.assertEqual(len(root_node['replies']), 2)
+        self.assertTrue(root_node['has_more_replies'])
+        self.assertEqual(root_node['replies_count'], 3)
+        
+        response = self.client.get(self.tree_url(max_depth=2))
+        deepest = response.data[0]['replies'][2]
+        self.assertEqual(deepest['replies'], [])
+        self.assertTrue(deepest['has_more_replies'])
+    
+    def test_flat_list_counts_replies_without_extra_queries(self):
+        """Test that the default listing annotates reply counts"""
+        for i in range(3):
+            self.comment(f'reply {i}', parent=self.comment(f'parent {i}'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/api/comments/?content_type=question&object_id={self.question.id}')
+        self.assertEqual(len(queries.captured_queries), 1)
+        self.assertEqual([c['replies_count'] for c in response.data], [1, 1, 1])
+
+
 class BestAnswerAPITestCase(TestCase):
     """Test cases for Best Answer marking"""
     
@@ -316,12 +541,44 @@ class ReportAPITestCase(TestCase):
         report.refresh_from_db()
         self.assertEqual(report.status, 'resolved')
 
+    
+    def test_report_invalid_content_type(self):
+        """Test that an unregistered content_type is rejected with 400"""
+        response = self.client.post('/api/reports/', {
+            'report_type': 'spam',
+            'description': 'Spam',
+            'content_type': 'user',
+            'object_id': self.user.id
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Report.objects.count(), 0)
+
+
+class ContentRegistryTestCase(TestCase):
+    """Test cases for the generic content kind registry"""
+    
+    def test_registered_kinds(self):
+        """Test that kinds resolve to their models and respect capabilities"""
+        kind = registry.get_kind('question', registry.VOTEABLE)
+        self.assertIs(kind.model, Question)
+        self.assertEqual(kind.content_type, ContentType.objects.get_for_model(Question))
+        self.assertEqual(registry.get_kind('comment', registry.REPORTABLE).model, Comment)
+        self.assertIsNone(registry.get_kind('comment', registry.VOTEABLE))
+        self.assertIsNone(registry.get_kind('user'))
+        self.assertEqual(registry.kind_names(registry.COMMENTABLE), ['question', 'answer'])
+    
+    def test_content_type_lookup_is_cached(self):
+        """Test that resolving a kind's content type does not query once warm"""
+        registry.get_kind('answer').content_type
+        with self.assertNumQueries(0):
+            self.assertEqual(registry.get_kind('answer').content_type_id, ContentType.objects.get_for_model(Answer).pk)
 
 class TagAPITestCase(TestCase):
     """Test cases for Tag API"""
     
     def setUp(self):
         self.client = APIClient()
+        cache.clear()
     
     def test_list_tags(self):
         """Test listing all tags"""
@@ -348,3 +605,438 @@ class TagAPITestCase(TestCase):
         response = self.client.get(f'/api/tags/{tag.id}/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['name'], 'python')
+    
+    def test_tag_list_pagination_is_opt_in(self):
+        """Test that ?page_size= pages the tag list by usage"""
+        for i in range(3):
+            Tag.objects.create(name=f'tag{i}', usage_count=i)
+        response = self.client.get('/api/tags/?page_size=2')
+        self.assertEqual([tag['name'] for tag in response.data['results']], ['tag2', 'tag1'])
+        response = self.client.get(response.data['next'])
+        self.assertEqual([tag['name'] for tag in response.data['results']], ['tag0'])
+    
+    def test_popular_tags_are_cached_until_usage_changes(self):
+        """Test that popular tags are served from the cache and refreshed after a usage change"""
+        python = Tag.objects.create(name='python', usage_count=3)
+        Tag.objects.create(name='django', usage_count=5)
+        response = self.client.get('/api/tags/popular/')
+        self.assertEqual([tag['name'] for tag in response.data], ['django', 'python'])
+        with self.assertNumQueries(0):
+            self.client.get('/api/tags/popular/')
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            python.increment_usage()
+            python.increment_usage()
+            python.increment_usage()
+        response = self.client.get('/api/tags/popular/')
+        self.assertEqual(response.data[0], {'id': python.id, 'name': 'python', 'count': 6})
+    
+    def test_popular_tags_conditional_get(self):
+        """Test that popular tags carry an ETag and answer a matching If-None-Match with 304"""
+        python = Tag.objects.create(name='python', usage_count=3)
+        response = self.client.get('/api/tags/popular/')
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+        response = self.client.get('/api/tags/popular/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            python.increment_usage()
+        response = self.client.get('/api/tags/popular/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
+    def test_trending_tags_from_rollup(self):
+        """Test that trending tags sum the refreshed rollup over the requested window"""
+        user = User.objects.create_user(username='asker', email='asker@example.com', password='pass123')
+        python = Tag.objects.create(name='python')
+        django_tag = Tag.objects.create(name='django')
+        recent = Question.objects.create(title='Recent', body='Body', user=user)
+        recent.tags.add(python)
+        older = Question.objects.create(title='Older', body='Body', user=user)
+        older.tags.add(django_tag)
+        Question.objects.create(title='Older too', body='Body', user=user).tags.add(django_tag)
+        Question.objects.filter(title__startswith='Older').update(created_at=timezone.now() - timedelta(days=10))
+        
+        call_command('refresh_tag_trends', stdout=StringIO())
+        self.assertEqual(TagDailyUsage.objects.count(), 2)
+        
+        response = self.client.get('/api/tags/trending/?days=7')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [{'id': python.id, 'name': 'python', 'count': 1}])
+        response = self.client.get('/api/tags/trending/?days=30')
+        self.assertEqual([tag['name'] for tag in response.data['results']], ['django', 'python'])
+        self.assertEqual(self.client.get('/api/tags/trending/?days=3').status_code, status.HTTP_400_BAD_REQUEST)
+
+    
+    def test_autocomplete_by_prefix(self):
+        """Test that autocomplete matches case-insensitively and ranks by usage"""
+        Tag.objects.create(name='Python', usage_count=2)
+        Tag.objects.create(name='pytest', usage_count=7)
+        Tag.objects.create(name='django', usage_count=9)
+        response = self.client.get('/api/tags/autocomplete/?prefix=PY')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([tag['name'] for tag in response.data['results']], ['pytest', 'Python'])
+        response = self.client.get('/api/tags/autocomplete/?prefix=py&limit=1')
+        self.assertEqual([tag['name'] for tag in response.data['results']], ['pytest'])
+        self.assertEqual(self.client.get('/api/tags/autocomplete/').status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_autocomplete_sees_tags_created_by_questions(self):
+        """Test that tags created in bulk while tagging a question are searchable"""
+        user = User.objects.create_user(username='asker', email='asker@example.com', password='pass123')
+        self.client.force_authenticate(user=user)
+        self.client.post('/api/posts/', {'title': 'Q', 'body': 'Body', 'tags': ['Recursion']}, format='json')
+        response = self.client.get('/api/tags/autocomplete/?prefix=rec')
+        self.assertEqual(response.data['results'][0]['name'], 'recursion')
+
+
+class SearchAPITestCase(TestCase):
+    """Test cases for the full-text search endpoint"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.question = Question.objects.create(
+            title='Recursion in Python',
+            body='How does a recursive function return <b>values</b>?',
+            user=self.user
+        )
+        self.other_question = Question.objects.create(
+            title='Sorting lists',
+            body='Which algorithm does sorted() use?',
+            user=self.user
+        )
+        self.answer = Answer.objects.create(
+            question=self.other_question,
+            body='It uses Timsort, which is not recursive.',
+            user=self.user
+        )
+    
+    def test_search_ranks_title_matches_first(self):
+        """Test that a title match outranks a body-only match"""
+        response = self.client.get('/api/search/?q=recursion')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertEqual(len(results), 2)
+        self.assertEqual((results[0]['type'], results[0]['id']), ('question', self.question.id))
+        self.assertEqual((results[1]['type'], results[1]['question_id']), ('answer', self.other_question.id))
+        self.assertEqual(results[1]['title'], 'Sorting lists')
+    
+    def test_snippets_are_highlighted_and_escaped(self):
+        """Test that matches are wrapped in <mark> and user markup is escaped"""
+        response = self.client.get('/api/search/?q=values')
+        snippet = response.data['results'][0]['snippet']
+        self.assertIn('<mark>values</mark>', snippet)
+        self.assertIn('&lt;b&gt;', snippet)
+    
+    def test_index_follows_edits_and_deletes(self):
+        """Test that the index is kept in sync by the save/delete signals"""
+        self.answer.body = 'It uses merge sort.'
+        self.answer.save()
+        response = self.client.get('/api/search/?q=timsort')
+        self.assertEqual(response.data['results'], [])
+        
+        self.question.delete()
+        response = self.client.get('/api/search/?q=recursion')
+        self.assertEqual(response.data['results'], [])
+    
+    def test_search_pagination(self):
+        """Test that results are paginated with a next link"""
+        for i in range(3):
+            Question.objects.create(title=f'Graph question {i}', body='graphs', user=self.user)
+        response = self.client.get('/api/search/?q=graph&page_size=2')
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+        response = self.client.get('/api/search/?q=graph&page_size=2&page=2')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNone(response.data['next'])
+    
+    def test_search_requires_query(self):
+        """Test that an empty query is rejected"""
+        response = self.client.get('/api/search/?q=')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_search_operators_in_input_are_inert(self):
+        """Test that FTS syntax in user input does not cause errors"""
+        response = self.client.get('/api/search/?q=recursion OR "NEAR(')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class NotificationAPITestCase(TestCase):
+    """Test cases for the unread counter and the notification stream"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+    
+    def create_notification(self, message='Hello'):
+        return Notification.objects.create(user=self.user, notification_type='answer', message=message)
+    
+    def test_unread_count_follows_inbox_changes(self):
+        """Test that the cached unread count is refreshed on create and mark-read"""
+        notification = self.create_notification()
+        response = self.client.get('/api/notifications/unread-count/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['unread_count'], 1)
+        
+        self.create_notification()
+        self.assertEqual(self.client.get('/api/notifications/unread-count/').data['unread_count'], 2)
+        
+        self.client.post(f'/api/notifications/{notification.id}/mark-read/')
+        self.assertEqual(self.client.get('/api/notifications/unread-count/').data['unread_count'], 1)
+    
+    def test_unread_count_is_served_from_cache(self):
+        """Test that a repeated unread-count request does not count the table again"""
+        self.create_notification()
+        self.client.get('/api/notifications/unread-count/')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/notifications/unread-count/')
+        self.assertFalse(any('core_notification' in q['sql'] for q in queries.captured_queries))
+    
+    async def read_async_stream(self, stream):
+        return ''.join([chunk async for chunk in stream])
+    
+    def test_stream_resumes_after_last_event_id(self):
+        """Test that the stream pushes notifications newer than Last-Event-ID"""
+        first = self.create_notification('first')
+        second = self.create_notification('second')
+        with patch.object(NotificationStreamView, 'stream_timeout', 0):
+            response = self.client.get(
+                '/api/notifications/stream/',
+                HTTP_ACCEPT='text/event-stream',
+                HTTP_LAST_EVENT_ID=str(first.id),
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+            # The test client is WSGI: the stream must be a plain generator sent chunk by chunk
+            self.assertFalse(response.is_async)
+            body = b''.join(response.streaming_content).decode()
+        self.assertIn(f'id: {second.id}\nevent: notification\n', body)
+        self.assertIn('"message": "second"', body)
+        self.assertNotIn('"message": "first"', body)
+    
+    def test_async_stream_matches_sync_stream(self):
+        """Test that the ASGI generator pushes the same events"""
+        first = self.create_notification('first')
+        second = self.create_notification('second')
+        view = NotificationStreamView()
+        view.stream_timeout = 0
+        body = async_to_sync(self.read_async_stream)(view.event_stream(self.user.id, first.id))
+        self.assertEqual(body, ''.join(view.sync_event_stream(self.user.id, first.id)))
+        self.assertIn(f'id: {second.id}\nevent: notification\n', body)
+    
+    def test_stream_requires_authentication(self):
+        """Test that anonymous clients cannot open the stream"""
+        self.client.force_authenticate(user=None)
+        response = self.client.get('/api/notifications/stream/', HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_stream_accepts_a_ticket_instead_of_a_header(self):
+        """Test that an EventSource-style request authenticates with a ticket from stream/ticket/"""
+        notification = self.create_notification('ticketed')
+        ticket = self.client.post('/api/notifications/stream/ticket/').data['ticket']
+        self.client.force_authenticate(user=None)
+        with patch.object(NotificationStreamView, 'stream_timeout', 0):
+            response = self.client.get(
+                f'/api/notifications/stream/?ticket={ticket}&last_event_id=0',
+                HTTP_ACCEPT='text/event-stream',
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            body = b''.join(response.streaming_content).decode()
+        self.assertIn(f'id: {notification.id}\nevent: notification\n', body)
+    
+    def test_stream_rejects_bad_expired_and_inactive_tickets(self):
+        """Test that forged, stale or deactivated-user tickets are refused"""
+        from users.authentication import issue_stream_ticket
+        
+        ticket = issue_stream_ticket(self.user)
+        self.client.force_authenticate(user=None)
+        url = '/api/notifications/stream/?ticket='
+        response = self.client.get(url + ticket + 'x', HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        with override_settings(STREAM_TICKET_MAX_AGE=-1):
+            response = self.client.get(url + ticket, HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        response = self.client.get(url + ticket, HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        # Tickets open the stream only, not the rest of the API
+        User.objects.filter(pk=self.user.pk).update(is_active=True)
+        response = self.client.get('/api/notifications/?ticket=' + ticket)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_bulk_mark_read_only_touches_own_notifications(self):
+        """Test that the batch endpoint updates the requested own notifications in one statement"""
+        mine = [self.create_notification(str(i)) for i in range(3)]
+        other_user = User.objects.create_user(username='other', email='other@example.com', password='testpass123')
+        theirs = Notification.objects.create(user=other_user, notification_type='answer', message='Theirs')
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/notifications/mark-read/', {
+                'ids': [mine[0].id, mine[1].id, theirs.id]
+            }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 2)
+        updates = [q for q in queries.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        theirs.refresh_from_db()
+        self.assertFalse(theirs.is_read)
+        self.assertEqual(Notification.objects.filter(user=self.user, is_read=False).count(), 1)
+    
+    def test_bulk_mark_read_rejects_bad_payload(self):
+        """Test that ids must be a non-empty list of integers"""
+        response = self.client.post('/api/notifications/mark-read/', {'ids': ['abc']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post('/api/notifications/mark-read/', {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_mark_all_read(self):
+        """Test that mark-all-read clears the unread count"""
+        for i in range(3):
+            self.create_notification(str(i))
+        response = self.client.post('/api/notifications/mark-all-read/')
+        self.assertEqual(response.data['updated'], 3)
+        self.assertEqual(self.client.get('/api/notifications/unread-count/').data['unread_count'], 0)
+    
+    def test_inbox_unread_filter_and_pagination(self):
+        """Test ?unread=true filtering and cursor pagination of the inbox"""
+        notifications = [self.create_notification(str(i)) for i in range(5)]
+        notifications[0].mark_as_read()
+        
+        response = self.client.get('/api/notifications/?unread=true')
+        self.assertEqual(len(response.data), 4)
+        
+        response = self.client.get('/api/notifications/?page_size=3')
+        self.assertEqual([n['message'] for n in response.data['results']], ['4', '3', '2'])
+        response = self.client.get(response.data['next'])
+        self.assertEqual([n['message'] for n in response.data['results']], ['1', '0'])
+
+
+class NotificationDispatchTestCase(TestCase):
+    """Test cases for the outbox-based notification fan-out"""
+    
+    def setUp(self):
+        self.asker = User.objects.create_user(
+            username='asker',
+            email='asker@example.com',
+            password='testpass123'
+        )
+        self.helper = User.objects.create_user(
+            username='helper',
+            email='helper@example.com',
+            password='testpass123'
+        )
+        self.question = Question.objects.create(title='Test Question', body='Test body', user=self.asker)
+        # Drop the "question posted" entry queued above; its commit never happens in TestCase
+        NotificationOutbox.objects.all().delete()
+    
+    @override_settings(NOTIFICATION_DISPATCHER='inline')
+    def test_answer_notification_written_after_commit(self):
+        """Test that the question author is notified once the transaction commits"""
+        with self.captureOnCommitCallbacks(execute=True):
+            answer = Answer.objects.create(question=self.question, body='Answer', user=self.helper)
+            self.assertFalse(Notification.objects.filter(user=self.asker, notification_type='answer').exists())
+        
+        notification = Notification.objects.get(user=self.asker, notification_type='answer')
+        self.assertEqual(notification.actor, self.helper)
+        self.assertEqual(notification.content_object, answer)
+        self.assertFalse(NotificationOutbox.objects.exists())
+    
+    @override_settings(NOTIFICATION_DISPATCHER='inline')
+    def test_inline_handoff_retries_earlier_failures(self):
+        """Test that an entry left behind by a failed handoff is delivered with the next one"""
+        from unittest import mock
+        from core import notifications
+        
+        with mock.patch.object(notifications, 'process_outbox', side_effect=OperationalError('database is locked')):
+            with self.assertLogs('core.notifications', level='ERROR'), self.captureOnCommitCallbacks(execute=True):
+                Answer.objects.create(question=self.question, body='First', user=self.helper)
+        self.assertEqual(NotificationOutbox.objects.get().attempts, 1)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            Answer.objects.create(question=self.question, body='Second', user=self.helper)
+        self.assertEqual(Notification.objects.filter(user=self.asker, notification_type='answer').count(), 2)
+        self.assertFalse(NotificationOutbox.objects.exists())
+    
+    @override_settings(NOTIFICATION_DISPATCHER='worker')
+    def test_worker_command_drains_outbox(self):
+        """Test that in worker mode notifications wait in the outbox until the command runs"""
+        with self.captureOnCommitCallbacks(execute=True):
+            Answer.objects.create(question=self.question, body='Answer', user=self.helper)
+        self.assertFalse(Notification.objects.filter(notification_type='answer').exists())
+        self.assertEqual(NotificationOutbox.objects.count(), 1)
+        
+        call_command('process_notification_outbox', '--once', stdout=StringIO())
+        
+        self.assertTrue(Notification.objects.filter(user=self.asker, notification_type='answer').exists())
+        self.assertFalse(NotificationOutbox.objects.exists())
+    
+    def test_process_outbox_bulk_creates_in_chunks(self):
+        """Test that queued notifications are inserted with chunked bulk INSERTs"""
+        payloads = [
+            notification_payload(user=self.asker, notification_type='vote', message=f'Vote {i}')
+            for i in range(5)
+        ]
+        NotificationOutbox.objects.create(payload=payloads)
+        with CaptureQueriesContext(connection) as queries:
+            created = process_outbox(chunk_size=2)
+        self.assertEqual(created, 5)
+        inserts = [q for q in queries.captured_queries if q['sql'].startswith('INSERT INTO "core_notification"')]
+        self.assertEqual(len(inserts), 3)
+    
+    def test_bad_entry_does_not_block_the_outbox(self):
+        """Test that a failing entry is recorded and skipped while the rest is delivered"""
+        bad = NotificationOutbox.objects.create(payload=[{'user_id': self.asker.pk, 'no_such_field': 1}])
+        NotificationOutbox.objects.create(
+            payload=[notification_payload(user=self.asker, notification_type='vote', message='Vote')]
+        )
+        
+        with self.assertLogs('core.notifications', level='WARNING') as logs:
+            self.assertEqual(process_outbox(), 1)
+        self.assertIn(f'Failed to deliver notification outbox entry {bad.pk}', '\n'.join(logs.output))
+        bad.refresh_from_db()
+        self.assertEqual(bad.attempts, 1)
+        self.assertIn('no_such_field', bad.last_error)
+        
+        with self.settings(NOTIFICATION_OUTBOX_MAX_ATTEMPTS=3), self.assertLogs('core.notifications', level='WARNING'):
+            process_outbox()
+            process_outbox()
+        with self.settings(NOTIFICATION_OUTBOX_MAX_ATTEMPTS=3), self.assertNoLogs('core.notifications', level='WARNING'):
+            self.assertEqual(process_outbox(), 0)
+        bad.refresh_from_db()
+        self.assertEqual(bad.attempts, 3)
+    
+    def test_worker_mode_requires_a_shared_cache(self):
+        """Test that the system check rejects the worker dispatcher with a per-process cache"""
+        from core.checks import check_worker_cache
+        
+        locmem = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'cache'}}
+        with self.settings(NOTIFICATION_DISPATCHER='worker', CACHES=locmem):
+            self.assertEqual([error.id for error in check_worker_cache(None)], ['core.E001'])
+        with self.settings(NOTIFICATION_DISPATCHER='worker', CACHES=shared):
+            self.assertEqual(check_worker_cache(None), [])
+        with self.settings(NOTIFICATION_DISPATCHER='thread', CACHES=locmem):
+            self.assertEqual(check_worker_cache(None), [])
+    
+    def test_deleted_recipient_is_skipped(self):
+        """Test that payloads for since-deleted users are dropped instead of failing the batch"""
+        gone = User.objects.create_user(username='gone', email='gone@example.com', password='testpass123')
+        NotificationOutbox.objects.create(payload=[
+            notification_payload(user=gone, notification_type='vote', message='Lost', actor=self.helper),
+            notification_payload(user=self.asker, notification_type='vote', message='Kept', actor=gone),
+        ])
+        gone.delete()
+        
+        self.assertEqual(process_outbox(), 1)
+        notification = Notification.objects.get(message='Kept')
+        self.assertIsNone(notification.actor)
+        self.assertFalse(NotificationOutbox.objects.exists())
@@ -2,30 +2,47 @@ from django.urls import path
 from .views import (
     NotificationListView,
     NotificationMarkReadView,
+    NotificationBulkMarkReadView,
+    NotificationMarkAllReadView,
+    NotificationUnreadCountView,
+    NotificationStreamTicketView,
+    NotificationStreamView,
     TagListCreateView,
     TagDetailView,
+    TrendingTagsView,
+    TagAutocompleteView,
     VoteCreateView,
     VoteListView,
+    MyVotesView,
     CommentListCreateView,
     CommentDetailView,
     MarkBestAnswerView,
     ReportCreateView,
     ReportListView,
     ReportResolveView,
+    SearchView,
 )
 
 urlpatterns = [
     # Notifications
     path('notifications/', NotificationListView.as_view(), name='notification_list'),
     path('notifications/<int:pk>/mark-read/', NotificationMarkReadView.as_view(), name='notification_mark_read'),
+    path('notifications/mark-read/', NotificationBulkMarkReadView.as_view(), name='notification_bulk_mark_read'),
+    path('notifications/mark-all-read/', NotificationMarkAllReadView.as_view(), name='notification_mark_all_read'),
+    path('notifications/unread-count/', NotificationUnreadCountView.as_view(), name='notification_unread_count'),
+    path('notifications/stream/', NotificationStreamView.as_view(), name='notification_stream'),
+    path('notifications/stream/ticket/', NotificationStreamTicketView.as_view(), name='notification_stream_ticket'),
     
     # Tags
     path('tags/', TagListCreateView.as_view(), name='tag_list_create'),
     path('tags/<int:pk>/', TagDetailView.as_view(), name='tag_detail'),
+    path('tags/trending/', TrendingTagsView.as_view(), name='tag_trending'),
+    path('tags/autocomplete/', TagAutocompleteView.as_view(), name='tag_autocomplete'),
     
     # Voting
     path('votes/', VoteCreateView.as_view(), name='vote_create'),
     path('votes/list/', VoteListView.as_view(), name='vote_list'),
+    path('votes/mine/', MyVotesView.as_view(), name='my_votes'),
     
     # Comments
     path('comments/', CommentListCreateView.as_view(), name='comment_list_create'),
@@ -38,4 +55,7 @@ urlpatterns = [
     path('reports/', ReportCreateView.as_view(), name='report_create'),
     path('reports/list/', ReportListView.as_view(), name='report_list'),
     path('reports/<int:report_id>/resolve/', ReportResolveView.as_view(), name='report_resolve'),
+    
+    # Search
+    path('search/', SearchView.as_view(), name='search'),
 ]
@@ -1,35 +1,229 @@
+import asyncio
+import json
+import time
 from rest_framework import generics, permissions, status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.exceptions import PermissionDenied
-from django.contrib.contenttypes.models import ContentType
+from rest_framework.settings import api_settings
+from django.db.models import Count
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
 from .models import Notification, Tag, Vote, Comment, Report
 from .serializers import NotificationSerializer, TagSerializer, VoteSerializer, CommentSerializer, ReportSerializer
+from .voting import toggle_vote, user_vote_map
+from .comments import build_comment_tree
+from .notifications import get_unread_count, get_inbox_version, aget_inbox_version, inbox_changed
+from .pagination import OptionalCursorPagination
+from .caching import cached
+from .mixins import AnonymousResponseCacheMixin
+from .tagging import TAGS_CACHE_NAMESPACE, TAGS_CACHE_TTL, TRENDING_WINDOWS, autocomplete_tags, trending_tags
+from .renderers import EventStreamRenderer
+from users.authentication import StreamTicketAuthentication, issue_stream_ticket, stream_ticket_max_age
+from . import registry, search
 
 class NotificationListView(generics.ListAPIView):
+    """
+    The user's inbox, newest first. ?unread=true restricts it to unread
+    notifications; ?page_size= / ?cursor= switch on cursor pagination.
+    """
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = OptionalCursorPagination
 
     def get_queryset(self):
-        return Notification.objects.filter(user=self.request.user)
+        # (user, is_read, created_at) index covers both the plain and the unread-only listing
+        queryset = Notification.objects.filter(user=self.request.user).select_related('actor')
+        if self.request.query_params.get('unread', '').lower() in ('true', '1'):
+            queryset = queryset.filter(is_read=False)
+        return queryset.order_by('-created_at', '-id')
 
 class NotificationMarkReadView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, pk):
-        try:
-            notification = Notification.objects.get(pk=pk, user=request.user)
-            notification.mark_as_read()
-            return Response({'status': 'marked as read'}, status=status.HTTP_200_OK)
-        except Notification.DoesNotExist:
+        updated = Notification.objects.filter(pk=pk, user=request.user).update(is_read=True)
+        if not updated:
             return Response({'error': 'Notification not found'}, status=status.HTTP_404_NOT_FOUND)
+        inbox_changed([request.user.id])
+        return Response({'status': 'marked as read'}, status=status.HTTP_200_OK)
+
+class NotificationBulkMarkReadView(APIView):
+    """Mark a batch of the user's notifications as read in a single UPDATE"""
+    permission_classes = [permissions.IsAuthenticated]
+    max_batch_size = 500
+
+    def post(self, request):
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not ids:
+            return Response({'error': 'ids must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > self.max_batch_size:
+            return Response({'error': f'At most {self.max_batch_size} ids per request'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            ids = [int(notification_id) for notification_id in ids]
+        except (TypeError, ValueError):
+            return Response({'error': 'ids must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+        updated = Notification.objects.filter(user=request.user, id__in=ids, is_read=False).update(is_read=True)
+        if updated:
+            inbox_changed([request.user.id])
+        return Response({'status': 'marked as read', 'updated': updated}, status=status.HTTP_200_OK)
+
+class NotificationMarkAllReadView(APIView):
+    """Mark every unread notification of the user as read in a single UPDATE"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        updated = Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
+        if updated:
+            inbox_changed([request.user.id])
+        return Response({'status': 'marked as read', 'updated': updated}, status=status.HTTP_200_OK)
+
+class NotificationUnreadCountView(APIView):
+    """Unread badge count, served from a cached per-user counter"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        return Response({'unread_count': get_unread_count(request.user.id)}, status=status.HTTP_200_OK)
+
+class NotificationStreamTicketView(APIView):
+    """A short-lived ticket for opening the notification stream with EventSource"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        return Response(
+            {'ticket': issue_stream_ticket(request.user), 'expires_in': stream_ticket_max_age()},
+            status=status.HTTP_200_OK,
+        )
+
+class NotificationStreamView(APIView):
+    """
+    Server-Sent Events stream of new notifications.
+    
+    Deployed through studyflow/asgi.py (uvicorn workers, see render.yaml),
+    the generator is asynchronous so that an idle connection does not hold a
+    worker thread. Under WSGI (runserver) Django would have to drain an async
+    generator before sending anything, so a synchronous one is used there.
+    
+    EventSource cannot send the Authorization header: browsers POST to
+    stream/ticket/ and open `stream/?ticket=...`. A ticket is only accepted
+    for STREAM_TICKET_MAX_AGE seconds, so when the connection drops the
+    client fetches a new ticket and reopens it with ?last_event_id= set to the
+    last id it received. Clients that can set headers may use the token.
+    
+    It only queries the database when the user's inbox version in the cache
+    changes. The stream closes after `stream_timeout` seconds.
+    """
+    authentication_classes = [*api_settings.DEFAULT_AUTHENTICATION_CLASSES, StreamTicketAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [EventStreamRenderer, JSONRenderer]
+    stream_timeout = 55
+    poll_interval = 1
+    keepalive_interval = 15
+    batch_size = 50
+
+    def get(self, request):
+        last_event_id = request.headers.get('Last-Event-ID') or request.query_params.get('last_event_id')
+        try:
+            last_id = int(last_event_id)
+        except (TypeError, ValueError):
+            # Fresh connection: only push what arrives from now on
+            latest = Notification.objects.filter(user=request.user).order_by('-id').values_list('id', flat=True).first()
+            last_id = latest or 0
+
+        if isinstance(request._request, ASGIRequest):
+            stream = self.event_stream(request.user.id, last_id)
+        else:
+            stream = self.sync_event_stream(request.user.id, last_id)
+        response = StreamingHttpResponse(stream, content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    def pending_notifications(self, user_id, last_id):
+        return (
+            Notification.objects
+            .filter(user_id=user_id, id__gt=last_id)
+            .select_related('actor')
+            .order_by('id')[:self.batch_size]
+        )
+
+    def format_event(self, notification):
+        payload = json.dumps(NotificationSerializer(notification).data, default=str)
+        return f"id: {notification.id}\nevent: notification\ndata: {payload}\n\n"
+
+    async def event_stream(self, user_id, last_id):
+        deadline = time.monotonic() + self.stream_timeout
+        yield "retry: 3000\n\n"
+        version = None
+        while True:
+            current_version = await aget_inbox_version(user_id)
+            if current_version != version:
+                version = current_version
+                async for notification in self.pending_notifications(user_id, last_id):
+                    last_id = notification.id
+                    yield self.format_event(notification)
+
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            idle_until = min(deadline, now + self.keepalive_interval)
+            while time.monotonic() < idle_until:
+                await asyncio.sleep(self.poll_interval)
+                if await aget_inbox_version(user_id) != version:
+                    break
+            else:
+                yield ": keepalive\n\n"
+
+    def sync_event_stream(self, user_id, last_id):
+        """event_stream() for WSGI servers (runserver), which send each chunk as it is yielded"""
+        deadline = time.monotonic() + self.stream_timeout
+        yield "retry: 3000\n\n"
+        version = None
+        while True:
+            current_version = get_inbox_version(user_id)
+            if current_version != version:
+                version = current_version
+                for notification in self.pending_notifications(user_id, last_id):
+                    last_id = notification.id
+                    yield self.format_event(notification)
+
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            idle_until = min(deadline, now + self.keepalive_interval)
+            while time.monotonic() < idle_until:
+                time.sleep(self.poll_interval)
+                if get_inbox_version(user_id) != version:
+                    break
+            else:
+                yield ": keepalive\n\n"
 
 # ==================== TAGS ====================
-class TagListCreateView(generics.ListCreateAPIView):
-    """List all tags or create a new tag"""
-    queryset = Tag.objects.all().order_by('-usage_count')
+class TagCursorPagination(OptionalCursorPagination):
+    ordering = ('-usage_count', 'id')
+
+class TagListCreateView(AnonymousResponseCacheMixin, generics.ListCreateAPIView):
+    """
+    List all tags (most used first) or create a new tag.
+    The plain list (tag cloud) is cached; ?page_size= / ?cursor= paginate.
+    """
+    queryset = Tag.objects.all().order_by('-usage_count', 'id')
     serializer_class = TagSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = TagCursorPagination
+    response_cache_namespaces = (TAGS_CACHE_NAMESPACE,)
+    
+    def list(self, request, *args, **kwargs):
+        if self.paginator.is_requested(request):
+            return super().list(request, *args, **kwargs)
+        data = cached(
+            TAGS_CACHE_NAMESPACE, 'cloud',
+            lambda: TagSerializer(self.get_queryset(), many=True).data,
+            TAGS_CACHE_TTL,
+        )
+        return Response(data)
 
 class TagDetailView(generics.RetrieveAPIView):
     """Get details of a specific tag"""
@@ -37,6 +231,46 @@ class TagDetailView(generics.RetrieveAPIView):
     serializer_class = TagSerializer
     permission_classes = [permissions.AllowAny]
 
+class TagAutocompleteView(APIView):
+    """Tag suggestions for the ask-question form: ?prefix= (required), ?limit= (max 25), most used first"""
+    permission_classes = [permissions.AllowAny]
+    default_limit = 10
+    max_limit = 25
+    
+    def get(self, request):
+        prefix = request.query_params.get('prefix', '').strip()
+        if not prefix:
+            return Response({'error': 'Query parameter "prefix" is required'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(prefix) > Tag._meta.get_field('name').max_length:
+            return Response({'prefix': prefix, 'results': []}, status=status.HTTP_200_OK)
+        try:
+            limit = min(max(int(request.query_params.get('limit', self.default_limit)), 1), self.max_limit)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({'prefix': prefix, 'results': autocomplete_tags(prefix, limit)}, status=status.HTTP_200_OK)
+
+class TrendingTagsView(APIView):
+    """
+    Tags most used on recent questions: ?days=7 (default) or 30, ?limit= (max 50).
+    Served from the TagDailyUsage rollup, refreshed by `manage.py refresh_tag_trends`.
+    """
+    permission_classes = [permissions.AllowAny]
+    default_limit = 10
+    max_limit = 50
+    
+    def get(self, request):
+        try:
+            days = int(request.query_params.get('days', TRENDING_WINDOWS[0]))
+            limit = min(max(int(request.query_params.get('limit', self.default_limit)), 1), self.max_limit)
+        except ValueError:
+            return Response({'error': 'days and limit must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        if days not in TRENDING_WINDOWS:
+            windows = ', '.join(str(window) for window in TRENDING_WINDOWS)
+            return Response({'error': f'days must be one of {windows}'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({'days': days, 'results': trending_tags(days, limit)}, status=status.HTTP_200_OK)
+
 # ==================== VOTING ====================
 class VoteCreateView(APIView):
     """Cast a vote (upvote/downvote) on a question or answer"""
@@ -53,110 +287,188 @@ class VoteCreateView(APIView):
         if vote_type not in ['up', 'down']:
             return Response({'error': 'Invalid vote_type. Must be "up" or "down"'}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Get content type
         try:
-            if content_type_name == 'question':
-                from questions.models import Question
-                content_type = ContentType.objects.get_for_model(Question)
-                obj = Question.objects.get(id=object_id)
-            elif content_type_name == 'answer':
-                from answers.models import Answer
-                content_type = ContentType.objects.get_for_model(Answer)
-                obj = Answer.objects.get(id=object_id)
-            else:
-                return Response({'error': 'Invalid content_type'}, status=status.HTTP_400_BAD_REQUEST)
-        except Exception as e:
-            return Response({'error': f'Object not found: {str(e)}'}, status=status.HTTP_404_NOT_FOUND)
+            object_id = int(object_id)
+        except (TypeError, ValueError):
+            return Response({'error': 'object_id must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Check if user already voted
-        existing_vote = Vote.objects.filter(
-            user=request.user,
-            content_type=content_type,
-            object_id=object_id
-        ).first()
+        kind = registry.get_kind(content_type_name, registry.VOTEABLE)
+        if kind is None:
+            return Response({'error': 'Invalid content_type'}, status=status.HTTP_400_BAD_REQUEST)
         
-        if existing_vote:
-            if existing_vote.vote_type == vote_type:
-                # Remove vote if clicking same button
-                existing_vote.delete()
-                return Response({'message': 'Vote removed', 'action': 'removed'}, status=status.HTTP_200_OK)
-            else:
-                # Change vote
-                existing_vote.vote_type = vote_type
-                existing_vote.save()
-                return Response({'message': 'Vote changed', 'action': 'changed', 'vote_type': vote_type}, status=status.HTTP_200_OK)
-        
-        # Create new vote
-        vote = Vote.objects.create(
-            user=request.user,
-            vote_type=vote_type,
-            content_type=content_type,
-            object_id=object_id
-        )
+        if not kind.exists(object_id):
+            return Response({'error': f'Object not found: {content_type_name} {object_id}'}, status=status.HTTP_404_NOT_FOUND)
         
-        return Response({
-            'message': 'Vote created',
-            'action': 'created',
-            'vote_type': vote_type
-        }, status=status.HTTP_201_CREATED)
+        action, counters = toggle_vote(request.user, kind.content_type, object_id, vote_type)
+        
+        response_data = {
+            'action': action,
+            'upvotes': counters['upvotes'],
+            'downvotes': counters['downvotes'],
+            'score': counters['score'],
+        }
+        if action == 'removed':
+            response_data['message'] = 'Vote removed'
+            response_status = status.HTTP_200_OK
+        elif action == 'changed':
+            response_data.update({'message': 'Vote changed', 'vote_type': vote_type})
+            response_status = status.HTTP_200_OK
+        else:
+            response_data.update({'message': 'Vote created', 'vote_type': vote_type})
+            response_status = status.HTTP_201_CREATED
+        return Response(response_data, status=response_status)
+
+class VoteCursorPagination(OptionalCursorPagination):
+    ordering = ('-timestamp', '-id')
 
 class VoteListView(generics.ListAPIView):
-    """Get votes for a specific object"""
+    """
+    Votes for a specific object.
+    
+    ?summary=true returns {up, down, score, my_vote} from the stored counters
+    instead of the raw rows. The raw list (for moderation) supports cursor
+    pagination with ?page_size= / ?cursor=.
+    """
     serializer_class = VoteSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = VoteCursorPagination
     
-    def get_queryset(self):
+    def get_target(self):
         content_type_name = self.request.query_params.get('content_type')
         object_id = self.request.query_params.get('object_id')
         
         if not content_type_name or not object_id:
-            return Vote.objects.none()
+            return None, None
         
+        kind = registry.get_kind(content_type_name, registry.VOTEABLE)
+        if kind is None:
+            return None, None
+        return kind.content_type, object_id
+    
+    def get_queryset(self):
         try:
-            if content_type_name == 'question':
-                from questions.models import Question
-                content_type = ContentType.objects.get_for_model(Question)
-            elif content_type_name == 'answer':
-                from answers.models import Answer
-                content_type = ContentType.objects.get_for_model(Answer)
-            else:
+            content_type, object_id = self.get_target()
+            if content_type is None:
                 return Vote.objects.none()
-            
-            return Vote.objects.filter(content_type=content_type, object_id=object_id)
+            return Vote.objects.filter(content_type=content_type, object_id=object_id).select_related('user')
         except:
             return Vote.objects.none()
+    
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get('summary', '').lower() not in ('true', '1'):
+            return super().list(request, *args, **kwargs)
+        
+        content_type, object_id = self.get_target()
+        if content_type is None:
+            return Response({'error': 'content_type and object_id are required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            object_id = int(object_id)
+        except ValueError:
+            return Response({'error': 'object_id must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        counters = content_type.model_class().objects.filter(pk=object_id).values('upvotes', 'downvotes', 'score').first()
+        if counters is None:
+            return Response({'error': 'Object not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        my_votes = user_vote_map(request.user, {content_type.model: [object_id]})
+        return Response({
+            'up': counters['upvotes'],
+            'down': counters['downvotes'],
+            'score': counters['score'],
+            'my_vote': my_votes[content_type.model].get(object_id),
+        }, status=status.HTTP_200_OK)
+
+class MyVotesView(APIView):
+    """
+    The current user's votes on a batch of objects, in one query:
+    GET /api/votes/mine/?questions=1,2,3&answers=4,5
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    max_ids = 200
+    
+    def get(self, request):
+        targets = {}
+        for kind, param in (('question', 'questions'), ('answer', 'answers')):
+            raw = request.query_params.get(param, '')
+            try:
+                targets[kind] = {int(value) for value in raw.split(',') if value.strip()}
+            except ValueError:
+                return Response({'error': f'{param} must be a comma-separated list of ids'}, status=status.HTTP_400_BAD_REQUEST)
+            if len(targets[kind]) > self.max_ids:
+                return Response({'error': f'At most {self.max_ids} {param} per request'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        votes = user_vote_map(request.user, targets)
+        return Response({
+            'questions': votes['question'],
+            'answers': votes['answer'],
+        }, status=status.HTTP_200_OK)
 
 # ==================== COMMENTS ====================
 class CommentListCreateView(generics.ListCreateAPIView):
-    """List comments for an object or create a new comment"""
+    """
+    List comments for an object or create a new comment.
+    
+    By default only top-level comments are listed. With ?tree=true every
+    comment of the object is loaded in one query and returned as a nested
+    tree, limited by ?max_depth= and ?max_children= (replies per comment).
+    """
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    default_max_depth = 5
+    default_max_children = 50
+    max_depth_limit = 10
+    max_children_limit = 200
+    
+    def get_target_content_type(self):
+        kind = registry.get_kind(self.request.query_params.get('content_type'), registry.COMMENTABLE)
+        return kind.content_type if kind is not None else None
     
     def get_queryset(self):
-        content_type_name = self.request.query_params.get('content_type')
+        content_type = self.get_target_content_type()
         object_id = self.request.query_params.get('object_id')
         
-        if not content_type_name or not object_id:
+        if content_type is None or not object_id:
             return Comment.objects.none()
         
         try:
-            if content_type_name == 'question':
-                from questions.models import Question
-                content_type = ContentType.objects.get_for_model(Question)
-            elif content_type_name == 'answer':
-                from answers.models import Answer
-                content_type = ContentType.objects.get_for_model(Answer)
-            else:
-                return Comment.objects.none()
-            
             return Comment.objects.filter(
                 content_type=content_type,
                 object_id=object_id,
                 parent_comment=None  # Only top-level comments
-            ).order_by('created_at')
+            ).select_related('user').annotate(reply_total=Count('replies')).order_by('created_at')
         except:
             return Comment.objects.none()
     
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get('tree', '').lower() not in ('true', '1'):
+            return super().list(request, *args, **kwargs)
+        
+        content_type = self.get_target_content_type()
+        object_id = request.query_params.get('object_id')
+        if content_type is None or not object_id:
+            return Response([], status=status.HTTP_200_OK)
+        
+        try:
+            max_depth = min(int(request.query_params.get('max_depth', self.default_max_depth)), self.max_depth_limit)
+            max_children = min(int(request.query_params.get('max_children', self.default_max_children)), self.max_children_limit)
+            object_id = int(object_id)
+        except ValueError:
+            return Response({'error': 'object_id, max_depth and max_children must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # One query for the whole thread, whatever its shape
+        comments = Comment.objects.filter(
+            content_type=content_type,
+            object_id=object_id
+        ).select_related('user').order_by('created_at', 'id')
+        
+        tree = build_comment_tree(
+            comments,
+            serialize=lambda comment: dict(CommentSerializer(comment).data),
+            max_depth=max(max_depth, 1),
+            max_children=max(max_children, 1),
+        )
+        return Response(tree, status=status.HTTP_200_OK)
+    
     def perform_create(self, serializer):
         from rest_framework.exceptions import ValidationError
         
@@ -167,20 +479,13 @@ class CommentListCreateView(generics.ListCreateAPIView):
         if not content_type_name or not object_id:
             raise ValidationError({'detail': 'content_type and object_id are required'})
         
-        if content_type_name == 'question':
-            from questions.models import Question
-            content_type = ContentType.objects.get_for_model(Question)
-            # Verify question exists
-            if not Question.objects.filter(id=object_id).exists():
-                raise ValidationError({'detail': f'Question with id {object_id} not found'})
-        elif content_type_name == 'answer':
-            from answers.models import Answer
-            content_type = ContentType.objects.get_for_model(Answer)
-            # Verify answer exists
-            if not Answer.objects.filter(id=object_id).exists():
-                raise ValidationError({'detail': f'Answer with id {object_id} not found'})
-        else:
-            raise ValidationError({'detail': 'Invalid content_type. Must be "question" or "answer"'})
+        kind = registry.get_kind(content_type_name, registry.COMMENTABLE)
+        if kind is None:
+            choices = ' or '.join(f'"{name}"' for name in registry.kind_names(registry.COMMENTABLE))
+            raise ValidationError({'detail': f'Invalid content_type. Must be {choices}'})
+        if not kind.exists(object_id):
+            raise ValidationError({'detail': f'{kind.label} with id {object_id} not found'})
+        content_type = kind.content_type
         
         parent_comment = None
         if parent_id:
@@ -261,20 +566,15 @@ class ReportCreateView(generics.CreateAPIView):
         content_type_name = self.request.data.get('content_type')
         object_id = self.request.data.get('object_id')
         
-        if content_type_name == 'question':
-            from questions.models import Question
-            content_type = ContentType.objects.get_for_model(Question)
-        elif content_type_name == 'answer':
-            from answers.models import Answer
-            content_type = ContentType.objects.get_for_model(Answer)
-        elif content_type_name == 'comment':
-            content_type = ContentType.objects.get_for_model(Comment)
-        else:
-            raise ValueError('Invalid content_type')
+        kind = registry.get_kind(content_type_name, registry.REPORTABLE)
+        if kind is None:
+            from rest_framework.exceptions import ValidationError
+            choices = ', '.join(f'"{name}"' for name in registry.kind_names(registry.REPORTABLE))
+            raise ValidationError({'detail': f'Invalid content_type. Must be one of {choices}'})
         
         serializer.save(
             reporter=self.request.user,
-            content_type=content_type,
+            content_type=kind.content_type,
             object_id=object_id
         )
 
@@ -308,3 +608,38 @@ class ReportResolveView(APIView):
             'report_id': report.id,
             'status': resolution_status
         }, status=status.HTTP_200_OK)
+
+# ==================== SEARCH ====================
+class SearchView(APIView):
+    """Ranked full-text search over question titles/bodies and answer bodies"""
+    permission_classes = [permissions.AllowAny]
+    page_size = 20
+    max_page_size = 50
+    
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'error': 'Query parameter "q" is required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            page = max(int(request.query_params.get('page', 1)), 1)
+            page_size = min(max(int(request.query_params.get('page_size', self.page_size)), 1), self.max_page_size)
+        except ValueError:
+            return Response({'error': 'page and page_size must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Fetch one extra row to know whether a next page exists without a COUNT
+        results = search.search(query, limit=page_size + 1, offset=(page - 1) * page_size)
+        has_next = len(results) > page_size
+        
+        next_url = None
+        if has_next:
+            params = request.query_params.copy()
+            params['page'] = page + 1
+            next_url = request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+        
+        return Response({
+            'query': query,
+            'page': page,
+            'next': next_url,
+            'results': results[:page_size],
+        }, status=status.HTTP_200_OK)
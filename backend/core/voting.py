@@ -0,0 +1,248 @@
+# core/voting.py
+from django.conf import settings
+from django.apps import apps
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+from .models import Vote
+from .caching import question_changed
+from . import registry
+
+# Which User reputation column a vote on each content type feeds
+REPUTATION_FIELDS = {
+    'question': 'question_reputation',
+    'answer': 'answer_reputation',
+}
+
+
+def vote_deltas(old_type=None, new_type=None):
+    """
+    Return the (upvotes, downvotes) change caused by moving a user's vote
+    from old_type to new_type. Either side may be None (no vote).
+    """
+    up = down = 0
+    if old_type == 'up':
+        up -= 1
+    elif old_type == 'down':
+        down -= 1
+    if new_type == 'up':
+        up += 1
+    elif new_type == 'down':
+        down += 1
+    return up, down
+
+
+def apply_vote_change(content_type, object_id, old_type=None, new_type=None):
+    """
+    Shift the stored upvotes/downvotes/score counters on the voted object.
+    Uses F() expressions so concurrent votes never overwrite each other.
+    """
+    up, down = vote_deltas(old_type, new_type)
+    if not up and not down:
+        return
+
+    model_class = content_type.model_class()
+    model_class.objects.filter(pk=object_id).update(
+        upvotes=F('upvotes') + up,
+        downvotes=F('downvotes') + down,
+        score=F('score') + (up - down),
+    )
+    adjust_reputation(content_type.model, model_class.objects.filter(pk=object_id).values('user_id'), up - down)
+
+
+def adjust_reputation(content_kind, owner, delta):
+    """
+    Add delta to the reputation of owner (a user id, or a one-row queryset of
+    user ids) for content_kind ('question' or 'answer'), in one UPDATE.
+    """
+    field = REPUTATION_FIELDS.get(content_kind)
+    if field is None or not delta:
+        return
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    if not isinstance(owner, int):
+        owner = Subquery(owner[:1])
+    User.objects.filter(pk=owner).update(**{
+        field: F(field) + delta,
+        'reputation': F('reputation') + delta,
+    })
+
+
+def _insert_vote_if_absent(user, content_type, object_id, vote_type):
+    """
+    INSERT the vote unless the user already has one on the object.
+    Returns True if a row was inserted. Never raises IntegrityError on the
+    (user, content_type, object_id) unique constraint.
+    """
+    if connection.vendor in ('postgresql', 'sqlite'):
+        table = Vote._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} (user_id, vote_type, timestamp, content_type_id, object_id) "
+                f"VALUES (%s, %s, %s, %s, %s) "
+                f"ON CONFLICT (user_id, content_type_id, object_id) DO NOTHING RETURNING id",
+                [
+                    user.pk, vote_type,
+                    # Stored exactly like ORM-written timestamps (naive UTC text on SQLite)
+                    connection.ops.adapt_datetimefield_value(timezone.now()),
+                    content_type.pk, object_id,
+                ],
+            )
+            return cursor.fetchone() is not None
+
+    # Backends without ON CONFLICT: let the unique constraint arbitrate
+    try:
+        with transaction.atomic():
+            Vote.objects.create(user=user, vote_type=vote_type, content_type=content_type, object_id=object_id)
+        return True
+    except IntegrityError:
+        return False
+
+
+def _delete_vote_if_type(user, content_type, object_id, vote_type):
+    """
+    DELETE the user's vote on the object if it is of vote_type. Returns True
+    if a row was deleted. A plain statement: its row count is exact under
+    concurrency, and it sends no pre_delete, so the receiver settling votes
+    deleted elsewhere (core.signals.revoke_vote) stays out of toggle_vote().
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {Vote._meta.db_table} "
+            f"WHERE user_id = %s AND content_type_id = %s AND object_id = %s AND vote_type = %s",
+            [user.pk, content_type.pk, object_id, vote_type],
+        )
+        return cursor.rowcount > 0
+
+
+def toggle_vote(user, content_type, object_id, vote_type, max_attempts=3):
+    """
+    Apply a vote click the way the UI expects: same button removes the vote,
+    the other button flips it, no vote creates one.
+
+    Each step is a single conditional statement whose row count says what
+    actually happened, so concurrent clicks never double count or hit the
+    unique constraint. Counters and reputation are shifted in the same
+    transaction. Returns (action, counters) where action is 'removed',
+    'changed' or 'created' and counters holds the new upvotes/downvotes/score.
+    """
+    votes = Vote.objects.filter(user=user, content_type=content_type, object_id=object_id)
+    with transaction.atomic():
+        for _ in range(max_attempts):
+            if _delete_vote_if_type(user, content_type, object_id, vote_type):
+                action, old_type, new_type = 'removed', vote_type, None
+                break
+            if votes.exclude(vote_type=vote_type).update(vote_type=vote_type, timestamp=timezone.now()):
+                action, old_type, new_type = 'changed', ('down' if vote_type == 'up' else 'up'), vote_type
+                break
+            if _insert_vote_if_absent(user, content_type, object_id, vote_type):
+                action, old_type, new_type = 'created', None, vote_type
+                break
+            # Another request inserted a vote between our statements; re-evaluate
+        else:
+            raise IntegrityError('Could not apply vote after concurrent updates')
+
+        apply_vote_change(content_type, object_id, old_type=old_type, new_type=new_type)
+        # The UPDATE and raw SQL paths above send no signals
+        question_changed(registry.question_id_of(content_type.pk, object_id))
+        counters = (
+            content_type.model_class().objects
+            .filter(pk=object_id)
+            .values('upvotes', 'downvotes', 'score')
+            .first()
+        )
+    return action, counters
+
+
+def user_vote_map(user, targets):
+    """
+    Return the user's vote on many objects at once as
+    {'question': {id: 'up'|'down'}, 'answer': {...}}.
+
+    targets maps a content kind ('question', 'answer') to an iterable of ids.
+    A single query against the (user, content_type, object_id) unique index.
+    """
+    votes = {kind: {} for kind in targets}
+    if not getattr(user, 'is_authenticated', False):
+        return votes
+
+    condition = Q()
+    kinds_by_content_type = {}
+    for kind, object_ids in targets.items():
+        object_ids = set(object_ids)
+        if not object_ids:
+            continue
+        content_type = registry.get_kind(kind, registry.VOTEABLE).content_type
+        kinds_by_content_type[content_type.id] = kind
+        condition |= Q(content_type=content_type, object_id__in=object_ids)
+    if not kinds_by_content_type:
+        return votes
+
+    rows = Vote.objects.filter(condition, user=user).values_list('content_type_id', 'object_id', 'vote_type')
+    for content_type_id, object_id, vote_type in rows:
+        votes[kinds_by_content_type[content_type_id]][object_id] = vote_type
+    return votes
+
+
+def rebuild_vote_counters(model_class):
+    """
+    Recompute the stored counters of every row of model_class from the Vote
+    table. Runs as two UPDATE statements regardless of the number of rows.
+    Does not touch reputation; see recompute_reputation().
+    Returns the number of rows updated.
+    """
+    content_type = ContentType.objects.get_for_model(model_class)
+
+    def count_of(vote_type):
+        votes = (
+            Vote.objects
+            .filter(content_type=content_type, object_id=OuterRef('pk'), vote_type=vote_type)
+            .order_by()
+            .values('object_id')
+            .annotate(total=Count('id'))
+            .values('total')
+        )
+        return Coalesce(Subquery(votes), Value(0))
+
+    updated = model_class.objects.update(
+        upvotes=count_of('up'),
+        downvotes=count_of('down'),
+    )
+    model_class.objects.update(score=F('upvotes') - F('downvotes'))
+    return updated
+
+
+def recompute_reputation():
+    """
+    Rebuild every user's reputation from the Vote table: one UPDATE with a
+    grouped, correlated aggregate per content type, then one to sum them.
+    Returns the number of users updated.
+    """
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    net_vote = Case(
+        When(vote_type='up', then=Value(1)),
+        When(vote_type='down', then=Value(-1)),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+    def net_votes_on(content_kind):
+        # Vote -> Question/Answer join through the GenericRelation related_query_name
+        owner_lookup = f'{content_kind}__user'
+        votes = (
+            Vote.objects
+            .filter(**{owner_lookup: OuterRef('pk')})
+            .order_by()
+            .values(owner_lookup)
+            .annotate(total=Sum(net_vote))
+            .values('total')
+        )
+        return Coalesce(Subquery(votes), Value(0))
+
+    updated = User.objects.update(
+        question_reputation=net_votes_on('question'),
+        answer_reputation=net_votes_on('answer'),
+    )
+    User.objects.update(reputation=F('question_reputation') + F('answer_reputation'))
+    return updated
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class QuestionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'questions'
+
+    def ready(self):
+        from django.core.signals import request_finished
+        from .viewcounts import flush_if_due
+        request_finished.connect(flush_if_due, dispatch_uid='questions.flush_view_counts')
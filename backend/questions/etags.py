@@ -0,0 +1,107 @@
+# questions/etags.py
+"""
+Cheap fingerprints of what the question endpoints would return, used as
+ETags so unchanged resources short-circuit to 304 before any serialization.
+
+Each fingerprint is one aggregate query over indexed columns: edit times
+(updated_at), answer/comment counts and the votes themselves: the count and
+latest timestamp of the votes on the questions and their answers, and of the
+signed-in viewer's own votes (my_vote).
+
+Votes are fingerprinted rather than the stored vote counters because sums
+of counters let opposite changes on two items cancel out. A removed vote
+lowers the count; a new or flipped vote (toggle_vote rewrites the timestamp)
+raises the latest timestamp; so no combination goes unseen.
+"""
+import hashlib
+from django.db.models import Count, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from answers.models import Answer
+from core.models import Comment, Vote
+from .models import Question
+
+
+def _correlated(queryset, group_by, aggregate):
+    """A scalar subquery computing aggregate over queryset rows, grouped by group_by"""
+    return Subquery(queryset.order_by().values(group_by).annotate(value=aggregate).values('value')[:1])
+
+
+def _thread_stats(user):
+    """Per-question annotations covering its answers, comments and the viewer's votes"""
+    answers = Answer.objects.filter(question_id=OuterRef('pk'))
+    answer_comments = Comment.objects.filter(answer__question_id=OuterRef('pk'))
+    stats = {
+        'answers_total': _correlated(answers, 'question_id', Count('id')),
+        'answers_updated': _correlated(answers, 'question_id', Max('updated_at')),
+        'best_answer': _correlated(answers.filter(is_best_answer=True), 'question_id', Max('id')),
+        'comments_total': _correlated(Comment.objects.filter(question=OuterRef('pk')), 'object_id', Count('id')),
+        'comments_updated': _correlated(Comment.objects.filter(question=OuterRef('pk')), 'object_id', Max('updated_at')),
+        'answer_comments_total': _correlated(answer_comments, 'answer__question_id', Count('id')),
+        'answer_comments_updated': _correlated(answer_comments, 'answer__question_id', Max('updated_at')),
+    }
+    question_votes = Vote.objects.filter(question=OuterRef('pk'))
+    answer_votes = Vote.objects.filter(answer__question_id=OuterRef('pk'))
+    stats.update({
+        'votes_total': _correlated(question_votes, 'object_id', Count('id')),
+        'votes_latest': _correlated(question_votes, 'object_id', Max('timestamp')),
+        'answer_votes_total': _correlated(answer_votes, 'answer__question_id', Count('id')),
+        'answer_votes_latest': _correlated(answer_votes, 'answer__question_id', Max('timestamp')),
+    })
+    if user.is_authenticated:
+        my_question_votes = Vote.objects.filter(user=user, question=OuterRef('pk'))
+        my_answer_votes = Vote.objects.filter(user=user, answer__question_id=OuterRef('pk'))
+        stats.update({
+            'my_question_votes': _correlated(my_question_votes, 'object_id', Max('timestamp')),
+            'my_answer_votes': _correlated(my_answer_votes, 'answer__question_id', Count('id')),
+            'my_answer_votes_latest': _correlated(my_answer_votes, 'answer__question_id', Max('timestamp')),
+        })
+    return stats
+
+
+def question_fingerprint(question_id, user):
+    """State of one question and its thread, or None if it does not exist"""
+    stats = _thread_stats(user)
+    return (
+        Question.objects
+        .filter(pk=question_id)
+        .annotate(**stats)
+        .values('updated_at', 'is_closed', *stats)
+        .first()
+    )
+
+
+def feed_fingerprint(queryset, user):
+    """State of every question matched by queryset (a feed page, or a whole unpaginated feed), in one aggregate"""
+    stats = _thread_stats(user)
+    totals = {}
+    for name in stats:
+        if name.endswith(('updated', 'latest')):
+            totals[f'max_{name}'] = Max(name)
+        elif name == 'my_question_votes':
+            # A timestamp per question: count them and keep the latest
+            totals[f'count_{name}'] = Count(name)
+            totals[f'max_{name}'] = Max(name)
+        else:
+            totals[f'sum_{name}'] = Coalesce(Sum(name), Value(0))
+    return (
+        queryset
+        .order_by()
+        .annotate(**stats)
+        .aggregate(
+            questions=Count('pk'),
+            updated=Max('updated_at'),
+            activity=Max('last_activity_at'),
+            **totals,
+        )
+    )
+
+
+def make_etag(fingerprint, request):
+    """Quoted ETag for fingerprint as seen by this viewer at this URL and format"""
+    parts = (
+        sorted(fingerprint.items()),
+        request.user.pk,
+        request.get_full_path(),
+        request.accepted_renderer.format,
+    )
+    return f'"{hashlib.md5(repr(parts).encode()).hexdigest()}"'
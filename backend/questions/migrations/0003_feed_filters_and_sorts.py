@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:22
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+
+def backfill_last_activity(apps, schema_editor):
+    Question = apps.get_model('questions', 'Question')
+    Answer = apps.get_model('answers', 'Answer')
+    latest_answer = (
+        Answer.objects
+        .filter(question_id=OuterRef('pk'))
+        .order_by()
+        .values('question_id')
+        .annotate(latest=Max('created_at'))
+        .values('latest')
+    )
+    Question.objects.update(
+        last_activity_at=Greatest(F('created_at'), Coalesce(Subquery(latest_answer), F('created_at')))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_tag_name_prefix'),
+        ('questions', '0002_vote_counters'),
+        ('answers', '0003_vote_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='question',
+            name='questions_q_views_efe75b_idx',
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='last_activity_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(backfill_last_activity, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['-score', '-id'], name='question_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['-views', '-id'], name='question_views_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['-last_activity_at', '-id'], name='question_activity_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='question_user_newest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['is_closed', '-created_at', '-id'], name='question_closed_newest_idx'),
+        ),
+    ]
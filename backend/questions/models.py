@@ -3,7 +3,52 @@ from django.db import models
 from django.conf import settings
 from django.utils import timezone
 from django.contrib.contenttypes.fields import GenericRelation
-from core.models import Tag
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from core.models import Tag, Comment
+
+
+class QuestionQuerySet(models.QuerySet):
+    def with_feed_relations(self, include_answers=True):
+        """
+        Load everything the question serializers touch in a fixed number of
+        queries: author via JOIN, tags and answers (with their authors) via
+        prefetch, and answer/comment counts as annotations.
+        Summary listings pass include_answers=False to skip the answer prefetch.
+        """
+        from answers.models import Answer
+
+        comments = (
+            Comment.objects
+            .filter(content_type=ContentType.objects.get_for_model(self.model), object_id=OuterRef('pk'))
+            .order_by()
+            .values('object_id')
+            .annotate(total=Count('id'))
+            .values('total')
+        )
+        # A correlated count rather than JOIN + GROUP BY, so that ORDER BY ... LIMIT
+        # can walk the sort indexes instead of sorting every question
+        answers = (
+            Answer.objects
+            .filter(question_id=OuterRef('pk'))
+            .order_by()
+            .values('question_id')
+            .annotate(total=Count('id'))
+            .values('total')
+        )
+        queryset = self.select_related('user').prefetch_related('tags')
+        if include_answers:
+            # Best answer first, authors joined in the same query
+            queryset = queryset.prefetch_related(models.Prefetch(
+                'answers',
+                queryset=Answer.objects.select_related('user').order_by('-is_best_answer', '-created_at', '-id'),
+            ))
+        return queryset.annotate(
+            answer_total=Coalesce(Subquery(answers), Value(0)),
+            comment_total=Coalesce(Subquery(comments), Value(0)),
+        )
+
 
 class Question(models.Model):
     title = models.CharField(max_length=255)
@@ -15,31 +60,50 @@ class Question(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     views = models.PositiveIntegerField(default=0)
     is_closed = models.BooleanField(default=False)
+    # Bumped by new answers and comments (core.signals); drives ?sort=activity
+    last_activity_at = models.DateTimeField(default=timezone.now)
+    
+    # Denormalized vote counters (kept in sync by core.voting)
+    upvotes = models.PositiveIntegerField(default=0)
+    downvotes = models.PositiveIntegerField(default=0)
+    score = models.IntegerField(default=0)
     
     # Generic Relations to core models
     votes = GenericRelation('core.Vote', related_query_name='question')
     comments = GenericRelation('core.Comment', related_query_name='question')
     reports = GenericRelation('core.Report', related_query_name='question')
     
+    objects = QuestionQuerySet.as_manager()
     
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['created_at']),
-            models.Index(fields=['views']),
+            # Feed sort orders (see QuestionListCreateView.SORT_ORDERINGS)
+            models.Index(fields=['-score', '-id'], name='question_score_idx'),
+            models.Index(fields=['-views', '-id'], name='question_views_idx'),
+            models.Index(fields=['-last_activity_at', '-id'], name='question_activity_idx'),
+            # Feed filters combined with the default newest-first order
+            models.Index(fields=['user', '-created_at', '-id'], name='question_user_newest_idx'),
+            models.Index(fields=['is_closed', '-created_at', '-id'], name='question_closed_newest_idx'),
         ]
     
     def __str__(self):
         return self.title
     
     def vote_count(self):
-        upvotes = self.votes.filter(vote_type='up').count()
-        downvotes = self.votes.filter(vote_type='down').count()
-        return upvotes - downvotes
+        return self.score
     
     def comment_count(self):
+        if hasattr(self, 'comment_total'):
+            return self.comment_total
         return self.comments.count()
     
+    def answer_count(self):
+        if hasattr(self, 'answer_total'):
+            return self.answer_total
+        return self.answers.count()
+    
     def get_absolute_url(self):
         from django.urls import reverse
         return reverse('question_detail', args=[str(self.id)])
\ No newline at end of file
@@ -1,6 +1,8 @@
 from rest_framework import serializers
+from django.utils.text import Truncator
 from .models import Question
-from core.models import Tag
+from core.tagging import add_tags, set_tags
+from core.serializers import MyVoteField
 from answers.serializers import AnswerSerializer
 
 class QuestionSerializer(serializers.ModelSerializer):
@@ -13,22 +15,17 @@ class QuestionSerializer(serializers.ModelSerializer):
     tag_names = serializers.StringRelatedField(many=True, read_only=True, source='tags')
     answers = AnswerSerializer(many=True, read_only=True)
     user_username = serializers.CharField(source='user.username', read_only=True)
+    my_vote = MyVoteField(kind='question')
 
     class Meta:
         model = Question
-        fields = ['id', 'title', 'body', 'user', 'user_username', 'tags', 'tag_names', 'created_at', 'views', 'vote_count', 'comment_count', 'answers']
-        read_only_fields = ['user', 'user_username', 'created_at', 'views']
+        fields = ['id', 'title', 'body', 'user', 'user_username', 'tags', 'tag_names', 'created_at', 'views', 'upvotes', 'downvotes', 'score', 'vote_count', 'my_vote', 'comment_count', 'answers']
+        read_only_fields = ['user', 'user_username', 'created_at', 'views', 'upvotes', 'downvotes', 'score']
 
     def create(self, validated_data):
         tags_data = validated_data.pop('tags', [])
         question = Question.objects.create(**validated_data)
-        
-        for tag_name in tags_data:
-            # "Get or Create" logic for tags
-            tag, created = Tag.objects.get_or_create(name=tag_name.lower())
-            tag.increment_usage()
-            question.tags.add(tag)
-            
+        add_tags(question, tags_data)
         return question
 
     def update(self, instance, validated_data):
@@ -39,16 +36,30 @@ class QuestionSerializer(serializers.ModelSerializer):
             setattr(instance, attr, value)
         instance.save()
 
-        # Update tags if provided
+        # PUT/PATCH with tags replaces the whole set
         if tags_data is not None:
-            instance.tags.clear() # Optional: decide if you want to replace or append. PUT usually implies replace.
-            for tag_name in tags_data:
-                tag, created = Tag.objects.get_or_create(name=tag_name.lower())
-                if created:
-                     tag.increment_usage() # Only increment if it's new? Or every time? Let's say every usage.
-                # Actually usage count should probably be incremented on "add", but for simplicity let's just ensure it exists
-                # Refined logic: If we want to track usage count accurately we'd need more complex logic. 
-                # For now just make sure they tag exists.
-                instance.tags.add(tag)
+            set_tags(instance, tags_data)
         
         return instance
+
+
+class QuestionSummarySerializer(serializers.ModelSerializer):
+    """
+    Compact, read-only representation for feed listings (?view=summary).
+    Carries counts instead of the nested answers.
+    """
+    EXCERPT_LENGTH = 200
+
+    excerpt = serializers.SerializerMethodField()
+    tag_names = serializers.StringRelatedField(many=True, read_only=True, source='tags')
+    user_username = serializers.CharField(source='user.username', read_only=True)
+    my_vote = MyVoteField(kind='question')
+
+    class Meta:
+        model = Question
+        fields = ['id', 'title', 'excerpt', 'user', 'user_username', 'tag_names', 'created_at', 'views',
+                  'is_closed', 'score', 'vote_count', 'my_vote', 'answer_count', 'comment_count']
+        read_only_fields = fields
+
+    def get_excerpt(self, obj):
+        return Truncator(obj.body).chars(self.EXCERPT_LENGTH)
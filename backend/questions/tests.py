@@ -1,7 +1,11 @@
-from django.test import TestCase
+from unittest import skipUnless
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
 from rest_framework.test import APIClient
 from rest_framework import status
+from django.db import connection, models
+from django.test.utils import CaptureQueriesContext
 from questions.models import Question
 
 User = get_user_model()
@@ -155,3 +159,646 @@ class StudentPermissionsTestCase(TestCase):
             'object_id': question.id
         })
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+
+class QuestionFeedPaginationTestCase(TestCase):
+    """Test cursor pagination and query counts of the question feed"""
+    
+    def setUp(self):
+        from answers.models import Answer
+        from core.models import Comment, Tag
+        from django.contrib.contenttypes.models import ContentType
+        
+        self.client = APIClient()
+        self.student = User.objects.create_user(
+            username='student',
+            email='student@example.com',
+            password='pass123'
+        )
+        python = Tag.objects.create(name='python')
+        question_ct = ContentType.objects.get_for_model(Question)
+        for i in range(6):
+            question = Question.objects.create(title=f'Question {i}', body='Body', user=self.student)
+            question.tags.add(python)
+            Answer.objects.create(question=question, body='Answer', user=self.student)
+            Comment.objects.create(user=self.student, content='Comment', content_type=question_ct, object_id=question.id)
+    
+    def test_unpaginated_list_is_plain_list(self):
+        """Test that clients not asking for pages still get a plain list"""
+        response = self.client.get('/api/posts/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 6)
+        self.assertEqual(response.data[0]['comment_count'], 1)
+    
+    def test_cursor_pages_cover_feed_in_order(self):
+        """Test that following next links walks the feed newest first without gaps"""
+        response = self.client.get('/api/posts/?page_size=4')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first_page = [q['title'] for q in response.data['results']]
+        self.assertEqual(first_page, ['Question 5', 'Question 4', 'Question 3', 'Question 2'])
+        self.assertIsNotNone(response.data['next'])
+        
+        response = self.client.get(response.data['next'])
+        second_page = [q['title'] for q in response.data['results']]
+        self.assertEqual(second_page, ['Question 1', 'Question 0'])
+        self.assertIsNone(response.data['next'])
+    
+    def test_query_count_is_independent_of_page_size(self):
+        """Test that the feed issues the same number of queries for small and large pages"""
+        with CaptureQueriesContext(connection) as small_page:
+            self.client.get('/api/posts/?page_size=2')
+        with CaptureQueriesContext(connection) as large_page:
+            self.client.get('/api/posts/?page_size=6')
+        self.assertEqual(len(small_page.captured_queries), len(large_page.captured_queries))
+    
+    def test_summary_view_omits_nested_answers(self):
+        """Test that ?view=summary returns counts and an excerpt instead of answers"""
+        Question.objects.filter(title='Question 5').update(body='word ' * 100)
+        response = self.client.get('/api/posts/?view=summary')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        item = response.data[0]
+        self.assertNotIn('answers', item)
+        self.assertNotIn('body', item)
+        self.assertEqual(item['answer_count'], 1)
+        self.assertEqual(item['comment_count'], 1)
+        self.assertEqual(item['tag_names'], ['python'])
+        self.assertLessEqual(len(item['excerpt']), 200)
+    
+    def test_detail_defaults_to_full_view(self):
+        """Test that the detail endpoint keeps the nested answers by default"""
+        question = Question.objects.get(title='Question 0')
+        response = self.client.get(f'/api/posts/{question.id}/')
+        self.assertEqual(len(response.data['answers']), 1)
+        response = self.client.get(f'/api/posts/{question.id}/?view=summary')
+        self.assertNotIn('answers', response.data)
+    
+    def test_feed_embeds_my_vote_with_one_query(self):
+        """Test that my_vote is filled for questions and nested answers from one extra query"""
+        from answers.models import Answer
+        from core.models import Vote
+        from django.contrib.contenttypes.models import ContentType
+        
+        question = Question.objects.get(title='Question 5')
+        answer = Answer.objects.get(question=question)
+        Vote.objects.create(user=self.student, vote_type='up',
+                            content_type=ContentType.objects.get_for_model(Question), object_id=question.id)
+        Vote.objects.create(user=self.student, vote_type='down',
+                            content_type=ContentType.objects.get_for_model(Answer), object_id=answer.id)
+        
+        with CaptureQueriesContext(connection) as anonymous:
+            response = self.client.get('/api/posts/?page_size=3')
+        self.assertIsNone(response.data['results'][0]['my_vote'])
+        
+        self.client.force_authenticate(user=self.student)
+        with CaptureQueriesContext(connection) as signed_in:
+            response = self.client.get('/api/posts/?page_size=3')
+        self.assertEqual(response.data['results'][0]['my_vote'], 'up')
+        self.assertEqual(response.data['results'][0]['answers'][0]['my_vote'], 'down')
+        self.assertIsNone(response.data['results'][1]['my_vote'])
+        # The vote lookup, plus the page ids and fingerprint behind the ETag of signed-in reads
+        self.assertEqual(len(signed_in.captured_queries), len(anonymous.captured_queries) + 3)
+
+
+class QuestionTaggingTestCase(TestCase):
+    """Test that tag attachment keeps Tag.usage_count accurate"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.student = User.objects.create_user(
+            username='student',
+            email='student@example.com',
+            password='pass123'
+        )
+        self.client.force_authenticate(user=self.student)
+    
+    def usage(self):
+        from core.models import Tag
+        return dict(Tag.objects.values_list('name', 'usage_count'))
+    
+    def create_question(self, tags):
+        response = self.client.post('/api/posts/', {'title': 'Tagged', 'body': 'Body', 'tags': tags}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return Question.objects.get(pk=response.data['id'])
+    
+    def test_create_counts_each_tag_once(self):
+        """Test that duplicate and differently-cased names count once per question"""
+        self.create_question(['Python', 'python', 'django'])
+        self.create_question(['python'])
+        self.assertEqual(self.usage(), {'python': 2, 'django': 1})
+    
+    def test_create_query_count_is_independent_of_tag_count(self):
+        """Test that tagging costs the same number of queries for 1 and 8 tags"""
+        with CaptureQueriesContext(connection) as one_tag:
+            self.create_question(['a'])
+        with CaptureQueriesContext(connection) as many_tags:
+            self.create_question([f'tag{i}' for i in range(8)])
+        self.assertEqual(len(one_tag.captured_queries), len(many_tags.captured_queries))
+    
+    def test_update_replaces_tags_and_adjusts_usage(self):
+        """Test that replacing the tag set decrements removed tags and increments new ones"""
+        question = self.create_question(['python', 'django'])
+        response = self.client.patch(f'/api/posts/{question.id}/', {'tags': ['python', 'flask']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sorted(response.data['tag_names']), ['flask', 'python'])
+        self.assertEqual(self.usage(), {'python': 1, 'django': 0, 'flask': 1})
+    
+    def test_delete_releases_tags(self):
+        """Test that deleting a question gives its tags their usage back"""
+        question = self.create_question(['python'])
+        self.create_question(['python'])
+        question.delete()
+        self.assertEqual(self.usage(), {'python': 1})
+
+
+class QuestionFeedFilterTestCase(TestCase):
+    """Test server-side filters and sort orders of the question feed"""
+    
+    def setUp(self):
+        from answers.models import Answer
+        from core.models import Tag
+        from django.utils import timezone
+        from datetime import timedelta
+        
+        self.client = APIClient()
+        self.alice = User.objects.create_user(username='alice', email='alice@example.com', password='pass123')
+        self.bob = User.objects.create_user(username='bob', email='bob@example.com', password='pass123')
+        python = Tag.objects.create(name='python')
+        now = timezone.now()
+        # q0..q7, oldest first; even ones by alice and tagged python
+        self.questions = []
+        for i in range(8):
+            question = Question.objects.create(
+                title=f'q{i}', body='Body', user=self.alice if i % 2 == 0 else self.bob,
+                created_at=now - timedelta(hours=8 - i), views=i * 10 % 7, score=(i * 3) % 5,
+                is_closed=(i == 3),
+            )
+            if i % 2 == 0:
+                question.tags.add(python)
+            self.questions.append(question)
+        Question.objects.update(last_activity_at=models.F('created_at'))
+        Answer.objects.create(question=self.questions[1], body='A', user=self.alice)
+        Answer.objects.create(question=self.questions[2], body='A', user=self.bob, is_best_answer=True)
+    
+    def titles(self, query):
+        response = self.client.get(f'/api/posts/?view=summary&{query}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return [item['title'] for item in response.data]
+    
+    def test_filters(self):
+        """Test each filter on its own"""
+        self.assertEqual(self.titles('tag=Python'), ['q6', 'q4', 'q2', 'q0'])
+        self.assertEqual(self.titles(f'user={self.bob.id}'), ['q7', 'q5', 'q3', 'q1'])
+        self.assertEqual(self.titles('is_closed=true'), ['q3'])
+        self.assertNotIn('q3', self.titles('is_closed=false'))
+        self.assertEqual(self.titles('has_best_answer=true'), ['q2'])
+        self.assertEqual(self.titles('unanswered=true'), ['q7', 'q6', 'q5', 'q4', 'q3', 'q0'])
+    
+    def test_filters_combine(self):
+        """Test that filters are ANDed"""
+        self.assertEqual(self.titles('tag=python&unanswered=true'), ['q6', 'q4', 'q0'])
+    
+    def test_sort_orders(self):
+        """Test the votes, views and activity orders, ties broken by newest id"""
+        self.assertEqual(self.titles('sort=votes'), ['q3', 'q6', 'q1', 'q4', 'q7', 'q2', 'q5', 'q0'])
+        self.assertEqual(self.titles('sort=views'), ['q2', 'q4', 'q6', 'q1', 'q3', 'q5', 'q7', 'q0'])
+        self.assertEqual(self.titles('sort=activity')[:2], ['q2', 'q1'])
+    
+    def test_sorted_cursor_pages(self):
+        """Test that cursor pagination follows the requested sort"""
+        response = self.client.get('/api/posts/?view=summary&sort=votes&page_size=5')
+        first = [item['title'] for item in response.data['results']]
+        second = [item['title'] for item in self.client.get(response.data['next']).data['results']]
+        self.assertEqual(first + second, self.titles('sort=votes'))
+    
+    def test_invalid_parameters(self):
+        """Test that bad filter and sort values are rejected with 400"""
+        for query in ('sort=random', 'user=bob', 'unanswered=maybe'):
+            response = self.client.get(f'/api/posts/?{query}')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, query)
+    
+    def test_comment_bumps_activity(self):
+        """Test that a comment on an answer moves its question to the top of the activity order"""
+        from core.models import Comment
+        from django.contrib.contenttypes.models import ContentType
+        from answers.models import Answer
+        
+        answer = Answer.objects.get(question=self.questions[1])
+        Comment.objects.create(user=self.bob, content='Nice', object_id=answer.id,
+                               content_type=ContentType.objects.get_for_model(Answer))
+        self.assertEqual(self.titles('sort=activity')[0], 'q1')
+    
+    @skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN output is SQLite specific')
+    def test_query_plans_use_indexes(self):
+        """Test that each sort and filter walks its index instead of sorting the table"""
+        expected = {
+            'sort=newest': 'questions_q_created_',
+            'sort=votes': 'question_score_idx',
+            'sort=views': 'question_views_idx',
+            'sort=activity': 'question_activity_idx',
+            f'user={self.alice.id}': 'question_user_newest_idx',
+            'tag=python': 'questions_question_tags_tag_id',
+        }
+        for query, index in expected.items():
+            with CaptureQueriesContext(connection) as context:
+                self.client.get(f'/api/posts/?view=summary&page_size=5&{query}')
+            feed_sql = next(
+                captured['sql'] for captured in context.captured_queries
+                if 'FROM "questions_question"' in captured['sql'] and 'ORDER BY' in captured['sql']
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {feed_sql}')
+                plan = ' | '.join(row[-1] for row in cursor.fetchall())
+            self.assertIn(index, plan, query)
+            if not query.startswith('tag='):
+                self.assertNotIn('TEMP B-TREE', plan, query)
+
+
+class QuestionViewCountTestCase(TestCase):
+    """Test buffered, deduplicated question view counting"""
+    
+    def setUp(self):
+        from django.core.cache import cache
+        from questions import viewcounts
+        
+        cache.clear()
+        viewcounts._pending.clear()
+        self.addCleanup(viewcounts._pending.clear)
+        self.client = APIClient()
+        self.author = User.objects.create_user(username='author', email='author@example.com', password='pass123')
+        self.reader = User.objects.create_user(username='reader', email='reader@example.com', password='pass123')
+        self.question = Question.objects.create(title='Viewed', body='Body', user=self.author)
+        self.other = Question.objects.create(title='Other', body='Body', user=self.author)
+    
+    @override_settings(QUESTION_VIEW_FLUSH_INTERVAL=3600)
+    def test_reads_are_write_free_and_deduplicated(self):
+        """Test that a repeat view by the same user counts once and no UPDATE is issued"""
+        self.client.force_authenticate(user=self.reader)
+        with CaptureQueriesContext(connection) as context:
+            first = self.client.get(f'/api/posts/{self.question.id}/')
+            second = self.client.get(f'/api/posts/{self.question.id}/')
+        self.assertFalse([q for q in context.captured_queries if q['sql'].startswith('UPDATE')])
+        self.assertEqual(first.data['views'], 1)
+        self.assertEqual(second.data['views'], 1)
+        self.question.refresh_from_db()
+        self.assertEqual(self.question.views, 0)
+    
+    @override_settings(QUESTION_VIEW_FLUSH_INTERVAL=3600)
+    def test_flush_writes_all_questions_in_one_update(self):
+        """Test that buffered views of several questions are written by a single UPDATE"""
+        from questions.viewcounts import flush_view_counts
+        
+        for address in ('10.0.0.1', '10.0.0.2', '10.0.0.3'):
+            self.client.get(f'/api/posts/{self.question.id}/', REMOTE_ADDR=address)
+        self.client.get(f'/api/posts/{self.other.id}/', REMOTE_ADDR='10.0.0.1')
+        
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(flush_view_counts(), 2)
+        self.assertEqual(len(context.captured_queries), 1)
+        self.question.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual((self.question.views, self.other.views), (3, 1))
+        self.assertEqual(flush_view_counts(), 0)
+    
+    def test_anonymous_viewers_behind_a_proxy_are_told_apart(self):
+        """Test that client IPs come from X-Forwarded-For when NUM_PROXIES is set"""
+        from django.conf import settings
+        from questions.viewcounts import viewer_key
+        from rest_framework.test import APIRequestFactory
+        
+        factory = APIRequestFactory()
+        behind_proxy = {'REMOTE_ADDR': '10.0.0.254'}
+        first = factory.get('/', HTTP_X_FORWARDED_FOR='203.0.113.7, 10.0.0.9', **behind_proxy)
+        second = factory.get('/', HTTP_X_FORWARDED_FOR='198.51.100.2, 10.0.0.9', **behind_proxy)
+        for request in (first, second):
+            request.user = AnonymousUser()
+        with self.settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'NUM_PROXIES': 2}):
+            self.assertEqual(viewer_key(first), 'ip:203.0.113.7')
+            self.assertEqual(viewer_key(second), 'ip:198.51.100.2')
+        with self.settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'NUM_PROXIES': 0}):
+            self.assertEqual(viewer_key(first), 'ip:10.0.0.254')
+    
+    @override_settings(QUESTION_VIEW_FLUSH_INTERVAL=0)
+    def test_flush_after_request_once_due(self):
+        """Test that the buffer is flushed at the end of a request once the interval has passed"""
+        self.client.get(f'/api/posts/{self.question.id}/')
+        self.question.refresh_from_db()
+        self.assertEqual(self.question.views, 1)
+
+
+@override_settings(QUESTION_VIEW_FLUSH_INTERVAL=3600)
+class QuestionThreadTestCase(TestCase):
+    """Test the one-request question page endpoint"""
+    
+    def setUp(self):
+        from django.core.cache import cache
+        from questions import viewcounts
+        
+        cache.clear()
+        viewcounts._pending.clear()
+        self.addCleanup(viewcounts._pending.clear)
+        self.client = APIClient()
+        self.author = User.objects.create_user(username='author', email='author@example.com', password='pass123')
+        self.reader = User.objects.create_user(username='reader', email='reader@example.com', password='pass123')
+        self.question = Question.objects.create(title='Thread', body='Body', user=self.author)
+        self.client.force_authenticate(user=self.reader)
+    
+    def add_answer(self, **kwargs):
+        from answers.models import Answer
+        return Answer.objects.create(question=self.question, body='Answer', user=self.author, **kwargs)
+    
+    def add_comment(self, target, parent=None):
+        from core.models import Comment
+        from django.contrib.contenttypes.models import ContentType
+        return Comment.objects.create(user=self.reader, content='Comment', parent_comment=parent,
+                                      content_type=ContentType.objects.get_for_model(target), object_id=target.id)
+    
+    def test_thread_contents(self):
+        """Test that answers come best first, each with its comment tree and the viewer's vote"""
+        from core.models import Vote
+        from django.contrib.contenttypes.models import ContentType
+        
+        plain = self.add_answer()
+        best = self.add_answer(is_best_answer=True)
+        top = self.add_comment(self.question)
+        self.add_comment(self.question, parent=top)
+        self.add_comment(plain)
+        Vote.objects.create(user=self.reader, vote_type='up', object_id=best.id,
+                            content_type=ContentType.objects.get_for_model(best))
+        
+        response = self.client.get(f'/api/posts/{self.question.id}/thread/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([answer['id'] for answer in response.data['answers']], [best.id, plain.id])
+        self.assertEqual(len(response.data['comments']), 1)
+        self.assertEqual(len(response.data['comments'][0]['replies']), 1)
+        self.assertEqual(response.data['answers'][0]['comments'], [])
+        self.assertEqual(len(response.data['answers'][1]['comments']), 1)
+        self.assertEqual(response.data['answers'][0]['my_vote'], 'up')
+        self.assertIsNone(response.data['my_vote'])
+    
+    def test_query_count_is_independent_of_thread_size(self):
+        """Test that a large thread costs the same number of queries as a small one"""
+        self.add_comment(self.add_answer())
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(f'/api/posts/{self.question.id}/thread/')
+        
+        for _ in range(4):
+            answer = self.add_answer()
+            self.add_comment(self.add_comment(answer))
+            self.add_comment(self.question)
+        self.client.force_authenticate(user=self.author)
+        with CaptureQueriesContext(connection) as large:
+            self.client.get(f'/api/posts/{self.question.id}/thread/')
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+    
+    def test_missing_question(self):
+        """Test that an unknown question id returns 404"""
+        response = self.client.get('/api/posts/99999/thread/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(QUESTION_VIEW_FLUSH_INTERVAL=3600)
+class QuestionResponseCacheTestCase(TestCase):
+    """Test the anonymous response cache of the question endpoints"""
+    
+    def setUp(self):
+        from django.core.cache import cache
+        from questions import viewcounts
+        
+        cache.clear()
+        viewcounts._pending.clear()
+        self.addCleanup(viewcounts._pending.clear)
+        self.client = APIClient()
+        self.author = User.objects.create_user(username='author', email='author@example.com', password='pass123')
+        self.question = Question.objects.create(title='Cached', body='Body', user=self.author)
+        self.url = f'/api/posts/{self.question.id}/'
+    
+    def test_repeat_anonymous_read_skips_the_database(self):
+        """Test that a cached anonymous response is served without queries"""
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data['title'], 'Cached')
+        self.client.get('/api/posts/')
+        with self.assertNumQueries(0):
+            self.client.get('/api/posts/')
+    
+    def test_conditional_get_returns_304(self):
+        """Test that If-None-Match and If-Modified-Since short-circuit to 304"""
+        response = self.client.get(self.url)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+    
+    def test_writes_invalidate_cached_responses(self):
+        """Test that answers, votes, comments and tag changes show up on the next anonymous read"""
+        from answers.models import Answer
+        
+        etag = self.client.get(self.url)['ETag']
+        Answer.objects.create(question=self.question, body='Answer', user=self.author)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['answers']), 1)
+        
+        voter = User.objects.create_user(username='voter', email='voter@example.com', password='pass123')
+        self.client.force_authenticate(user=voter)
+        self.client.post('/api/votes/', {'vote_type': 'up', 'content_type': 'question', 'object_id': self.question.id})
+        self.client.post('/api/comments/', {'content': 'Hi', 'content_type': 'question', 'object_id': self.question.id})
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get(self.url).data['score'], 1)
+        self.assertEqual(self.client.get('/api/posts/').data[0]['comment_count'], 1)
+        
+        self.client.force_authenticate(user=self.author)
+        self.client.patch(self.url, {'tags': ['python']}, format='json')
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get(self.url).data['tag_names'], ['python'])
+    
+    def test_other_questions_activity_keeps_this_page_cached(self):
+        """Test that detail/thread entries are only invalidated by their own question, the feed by any"""
+        from answers.models import Answer
+        from core.models import Tag
+        
+        other = Question.objects.create(title='Other', body='Body', user=self.author)
+        thread_url = f'{self.url}thread/'
+        for url in (self.url, thread_url, '/api/posts/'):
+            self.client.get(url)
+        voter = User.objects.create_user(username='voter', email='voter@example.com', password='pass123')
+        self.client.force_authenticate(user=voter)
+        answer = Answer.objects.create(question=other, body='Elsewhere', user=self.author)
+        self.client.post('/api/votes/', {'vote_type': 'up', 'content_type': 'question', 'object_id': other.id})
+        self.client.post('/api/votes/', {'vote_type': 'up', 'content_type': 'answer', 'object_id': answer.id})
+        self.client.post('/api/comments/', {'content': 'Hi', 'content_type': 'answer', 'object_id': answer.id})
+        self.client.force_authenticate(user=None)
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+            self.client.get(thread_url)
+        self.assertEqual(len(self.client.get('/api/posts/').data), 2)
+        
+        self.client.force_authenticate(user=self.author)
+        self.client.patch(self.url, {'tags': ['python']}, format='json')
+        self.client.force_authenticate(user=None)
+        self.client.get(self.url)
+        tag = Tag.objects.get(name='python')
+        tag.name = 'py'
+        tag.save()
+        self.assertEqual(self.client.get(self.url).data['tag_names'], ['py'])
+    
+    def test_signed_in_reads_are_not_cached(self):
+        """Test that signed-in users get their own, uncached representation"""
+        anonymous_etag = self.client.get(self.url)['ETag']
+        self.client.force_authenticate(user=self.author)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=anonymous_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], anonymous_etag)
+    
+    def test_cached_reads_still_count_views(self):
+        """Test that anonymous views served from the cache are counted"""
+        from questions.viewcounts import flush_view_counts
+        
+        self.client.get(self.url, REMOTE_ADDR='10.0.0.1')
+        self.client.get(self.url, REMOTE_ADDR='10.0.0.2')
+        flush_view_counts()
+        self.question.refresh_from_db()
+        self.assertEqual(self.question.views, 2)
+
+
+class QuestionConditionalGetTestCase(TestCase):
+    """Test the aggregate-based ETags served to signed-in users"""
+    
+    def setUp(self):
+        from django.core.cache import cache
+        from questions import viewcounts
+        
+        cache.clear()
+        viewcounts._pending.clear()
+        self.addCleanup(viewcounts._pending.clear)
+        self.client = APIClient()
+        self.author = User.objects.create_user(username='author', email='author@example.com', password='pass123')
+        self.reader = User.objects.create_user(username='reader', email='reader@example.com', password='pass123')
+        self.question = Question.objects.create(title='Polled', body='Body', user=self.author)
+        self.url = f'/api/posts/{self.question.id}/'
+        self.client.force_authenticate(user=self.reader)
+    
+    def assertNotModified(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+    
+    def assertModified(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        return response['ETag']
+    
+    def test_unchanged_question_returns_304_from_one_query(self):
+        """Test that a matching If-None-Match is answered by the fingerprint query alone"""
+        for url in (self.url, f'{self.url}thread/', '/api/posts/'):
+            etag = self.client.get(url)['ETag']
+            with self.assertNumQueries(1):
+                self.assertNotModified(url, etag)
+    
+    def test_feed_page_etag_only_covers_its_rows(self):
+        """Test that a page's ETag costs two bounded queries and ignores changes on other pages"""
+        from answers.models import Answer
+        
+        older = Question.objects.create(title='Older', body='Body', user=self.author)
+        newest = Question.objects.create(title='Newest', body='Body', user=self.author)
+        Question.objects.filter(pk=older.pk).update(created_at=self.question.created_at.replace(year=2000))
+        url = '/api/posts/?page_size=2'
+        response = self.client.get(url)
+        self.assertEqual([q['title'] for q in response.data['results']], ['Newest', 'Polled'])
+        etag = response['ETag']
+        with self.assertNumQueries(2) as context:
+            self.assertNotModified(url, etag)
+        self.assertTrue(all('LIMIT' in q['sql'] or 'IN (' in q['sql'] for q in context.captured_queries))
+        
+        Answer.objects.create(question=older, body='Elsewhere', user=self.reader)
+        self.assertNotModified(url, etag)
+        Answer.objects.create(question=newest, body='Here', user=self.reader)
+        etag = self.assertModified(url, etag)
+        Question.objects.create(title='Brand new', body='Body', user=self.author)
+        self.assertModified(url, etag)
+    
+    def test_thread_changes_move_the_etag(self):
+        """Test that answers, votes, best answers and comments change the detail and feed ETags"""
+        from answers.models import Answer
+        
+        detail_etag = self.client.get(self.url)['ETag']
+        feed_etag = self.client.get('/api/posts/')['ETag']
+        answer = Answer.objects.create(question=self.question, body='Answer', user=self.author)
+        detail_etag = self.assertModified(self.url, detail_etag)
+        feed_etag = self.assertModified('/api/posts/', feed_etag)
+        
+        self.client.force_authenticate(user=self.author)
+        self.client.post('/api/votes/', {'vote_type': 'up', 'content_type': 'answer', 'object_id': answer.id})
+        self.client.force_authenticate(user=self.reader)
+        detail_etag = self.assertModified(self.url, detail_etag)
+        feed_etag = self.assertModified('/api/posts/', feed_etag)
+        
+        Answer.objects.filter(pk=answer.pk).update(is_best_answer=True)
+        detail_etag = self.assertModified(self.url, detail_etag)
+        
+        self.client.post('/api/comments/', {'content': 'Hi', 'content_type': 'answer', 'object_id': answer.id})
+        detail_etag = self.assertModified(self.url, detail_etag)
+        self.assertModified('/api/posts/', feed_etag)
+    
+    def test_swapped_votes_move_the_etag(self):
+        """Test that one vote removed and another cast elsewhere still change the ETags"""
+        from answers.models import Answer
+        
+        other = Question.objects.create(title='Other', body='Body', user=self.author)
+        first = Answer.objects.create(question=self.question, body='First', user=self.author)
+        second = Answer.objects.create(question=self.question, body='Second', user=self.author)
+        voter = User.objects.create_user(username='voter', email='voter@example.com', password='pass123')
+        
+        def vote(user, content_type, object_id):
+            self.client.force_authenticate(user=user)
+            self.client.post('/api/votes/', {'vote_type': 'up', 'content_type': content_type, 'object_id': object_id})
+            self.client.force_authenticate(user=self.reader)
+        
+        vote(voter, 'answer', first.id)
+        vote(voter, 'question', self.question.id)
+        detail_etag = self.client.get(self.url)['ETag']
+        feed_etag = self.client.get('/api/posts/')['ETag']
+        vote(voter, 'answer', first.id)
+        vote(self.author, 'answer', second.id)
+        self.assertModified(self.url, detail_etag)
+        feed_etag = self.assertModified('/api/posts/', feed_etag)
+        
+        vote(voter, 'question', self.question.id)
+        vote(voter, 'question', other.id)
+        self.assertModified('/api/posts/', feed_etag)
+    
+    def test_etag_is_per_viewer_and_follows_their_votes(self):
+        """Test that my_vote is covered: another user's ETag differs, and voting moves the voter's"""
+        etag = self.client.get(self.url)['ETag']
+        self.client.force_authenticate(user=self.author)
+        self.assertModified(self.url, etag)
+        
+        self.client.force_authenticate(user=self.reader)
+        self.client.post('/api/votes/', {'vote_type': 'up', 'content_type': 'question', 'object_id': self.question.id})
+        etag = self.assertModified(self.url, etag)
+        self.client.post('/api/votes/', {'vote_type': 'down', 'content_type': 'question', 'object_id': self.question.id})
+        self.assertModified(self.url, etag)
+    
+    def test_views_do_not_move_the_etag(self):
+        """Test that counted views alone leave the ETag unchanged"""
+        from questions.viewcounts import flush_view_counts
+        
+        etag = self.client.get(self.url)['ETag']
+        flush_view_counts()
+        self.assertNotModified(self.url, etag)
+    
+    def test_feed_etag_depends_on_filters(self):
+        """Test that each filtered feed has its own ETag and bad filters still fail"""
+        etag = self.client.get('/api/posts/')['ETag']
+        self.assertModified('/api/posts/?unanswered=true', etag)
+        response = self.client.get('/api/posts/?sort=bogus')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_missing_question_is_still_404(self):
+        """Test that the ETag check does not hide a missing question"""
+        response = self.client.get('/api/posts/999999/', HTTP_IF_NONE_MATCH='"x"')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
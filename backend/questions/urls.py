@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import QuestionListCreateView, QuestionDetailView
+from .views import QuestionListCreateView, QuestionDetailView, QuestionThreadView
 
 urlpatterns = [
     path('', QuestionListCreateView.as_view(), name='question_list_create'),
     path('<int:pk>/', QuestionDetailView.as_view(), name='question_detail'),
+    path('<int:pk>/thread/', QuestionThreadView.as_view(), name='question_thread'),
 ]
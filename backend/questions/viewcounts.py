@@ -0,0 +1,108 @@
+# questions/viewcounts.py
+"""
+Buffered question view counting.
+
+Reading a question must not write to it: a save() per GET would serialize
+every reader of a hot question on its row lock. Instead:
+
+- each viewer (user id, or client IP address for anonymous readers) counts
+  once per question per QUESTION_VIEW_DEDUP_WINDOW seconds, enforced with
+  cache.add(). Behind a reverse proxy the client IP is taken from
+  X-Forwarded-For according to REST_FRAMEWORK['NUM_PROXIES'], as DRF's
+  throttles do; otherwise every anonymous reader would share the proxy's
+  address;
+- counted views are buffered in this process;
+- at most every QUESTION_VIEW_FLUSH_INTERVAL seconds, at the end of a request,
+  the buffer is written with a single UPDATE ... SET views = views + CASE ...
+
+Views still in a buffer when a process dies are lost, which is acceptable for
+a popularity counter.
+"""
+import atexit
+import logging
+import threading
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, F, IntegerField, Value, When
+from rest_framework.throttling import BaseThrottle
+from .models import Question
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_pending = {}
+_last_flush = time.monotonic()
+
+
+def flush_interval():
+    return getattr(settings, 'QUESTION_VIEW_FLUSH_INTERVAL', 10)
+
+
+def dedup_window():
+    return getattr(settings, 'QUESTION_VIEW_DEDUP_WINDOW', 60 * 30)
+
+
+def viewer_key(request):
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    return f"ip:{BaseThrottle().get_ident(request)}"
+
+
+def record_view(question_id, viewer):
+    """Count a view of question_id by viewer unless they viewed it recently. Returns True if counted."""
+    if not cache.add(f'questions:viewed:{question_id}:{viewer}', 1, dedup_window()):
+        return False
+    with _lock:
+        _pending[question_id] = _pending.get(question_id, 0) + 1
+    return True
+
+
+def pending_views(question_id):
+    """Views of question_id counted by this process but not yet written"""
+    return _pending.get(question_id, 0)
+
+
+def flush_view_counts():
+    """Write all buffered views in one UPDATE. Returns the number of questions updated."""
+    global _last_flush
+    with _lock:
+        batch = dict(_pending)
+        _pending.clear()
+        _last_flush = time.monotonic()
+    if not batch:
+        return 0
+
+    # Sorted ids: concurrent flushes from other processes lock rows in the same order
+    ids = sorted(batch)
+    increment = Case(
+        *[When(pk=question_id, then=Value(batch[question_id])) for question_id in ids],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    try:
+        return Question.objects.filter(pk__in=ids).update(views=F('views') + increment)
+    except Exception:
+        # Keep the views for the next flush rather than dropping them
+        with _lock:
+            for question_id, count in batch.items():
+                _pending[question_id] = _pending.get(question_id, 0) + count
+        raise
+
+
+def flush_if_due(**kwargs):
+    """request_finished receiver: flush once the interval has elapsed"""
+    if _pending and time.monotonic() - _last_flush >= flush_interval():
+        try:
+            flush_view_counts()
+        except Exception:
+            logger.exception("Failed to flush question view counts; will retry")
+
+
+@atexit.register
+def _flush_at_exit():
+    if _pending:
+        try:
+            flush_view_counts()
+        except Exception:
+            logger.exception("Dropping %d buffered question views at exit", sum(_pending.values()))
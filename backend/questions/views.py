@@ -1,12 +1,168 @@
+from collections import defaultdict
 from rest_framework import generics, permissions
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.response import Response
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from django.db.models import Exists, OuterRef, Q
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from answers.models import Answer
 from .models import Question
-from .serializers import QuestionSerializer
+from .serializers import QuestionSerializer, QuestionSummarySerializer
+from .viewcounts import pending_views, record_view, viewer_key
+from .etags import feed_fingerprint, make_etag, question_fingerprint
+from core.pagination import OptionalCursorPagination
+from core.mixins import AnonymousResponseCacheMixin, MyVoteContextMixin
+from core.caching import QUESTIONS_CACHE_NAMESPACE, question_cache_namespace
+from core.comments import build_comment_tree
+from core.models import Comment
+from core.serializers import CommentSerializer
+from core import registry
 
-class QuestionListCreateView(generics.ListCreateAPIView):
-    queryset = Question.objects.all()
-    serializer_class = QuestionSerializer
+
+class QuestionRepresentationMixin:
+    """
+    Lets readers pick the representation with ?view=summary|full.
+    Writes always go through the full QuestionSerializer.
+    """
+    default_view = 'full'
+
+    def wants_summary(self):
+        if self.request.method != 'GET':
+            return False
+        return self.request.query_params.get('view', self.default_view) == 'summary'
+
+    def get_serializer_class(self):
+        if self.wants_summary():
+            return QuestionSummarySerializer
+        return QuestionSerializer
+
+
+class QuestionETagMixin:
+    """
+    Conditional GET for signed-in users (anonymous ones are served by
+    AnonymousResponseCacheMixin, which has its own ETags).
+
+    The ETag is derived from get_fingerprint(), one aggregate query over
+    edit times and counters (questions.etags), run before anything is
+    serialized; a matching If-None-Match gets a 304 without loading or
+    serializing the question and its answers. View counts are left out of
+    the fingerprint, so a new view alone does not change the ETag.
+    """
+
+    def get(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return super().get(request, *args, **kwargs)
+
+        fingerprint = self.get_fingerprint(request, *args, **kwargs)
+        if fingerprint is None:
+            # Nothing to fingerprint (e.g. no such question): let the view answer
+            return super().get(request, *args, **kwargs)
+        etag = make_etag(fingerprint, request)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            self.not_modified(request, *args, **kwargs)
+            response = not_modified
+        else:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        patch_vary_headers(response, ('Authorization', 'Cookie'))
+        return response
+
+    def get_fingerprint(self, request, *args, **kwargs):
+        return question_fingerprint(kwargs['pk'], request.user)
+
+    def not_modified(self, request, *args, **kwargs):
+        """Called when a 304 is returned; the view's own side effects go here"""
+
+
+class QuestionCursorPagination(OptionalCursorPagination):
+    """Cursor pagination following the ordering picked by the view's ?sort="""
+
+    def get_ordering(self, request, queryset, view):
+        return view.get_sort_ordering()
+
+
+class QuestionListCreateView(QuestionETagMixin, AnonymousResponseCacheMixin, MyVoteContextMixin, QuestionRepresentationMixin, generics.ListCreateAPIView):
+    """
+    The question feed, or ask a new question.
+
+    Filters: ?tag=<name>, ?user=<id>, ?unanswered=true, ?is_closed=true|false,
+    ?has_best_answer=true|false. Sort with ?sort=newest (default), votes,
+    views or activity; each order has a matching index on Question.
+    """
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = QuestionCursorPagination
+    response_cache_namespaces = (QUESTIONS_CACHE_NAMESPACE,)
+    SORT_ORDERINGS = {
+        'newest': ('-created_at', '-id'),
+        'votes': ('-score', '-id'),
+        'views': ('-views', '-id'),
+        'activity': ('-last_activity_at', '-id'),
+    }
+    BOOLEAN_VALUES = {'true': True, '1': True, 'false': False, '0': False}
+
+    def get_sort_ordering(self):
+        sort = self.request.query_params.get('sort', 'newest')
+        if sort not in self.SORT_ORDERINGS:
+            raise ValidationError({'sort': f"Must be one of: {', '.join(self.SORT_ORDERINGS)}."})
+        return self.SORT_ORDERINGS[sort]
+
+    def get_boolean_param(self, param):
+        value = self.request.query_params.get(param)
+        if value is None:
+            return None
+        try:
+            return self.BOOLEAN_VALUES[value.lower()]
+        except KeyError:
+            raise ValidationError({param: 'Must be true or false.'})
+
+    def filter_queryset(self, queryset):
+        params = self.request.query_params
+        if params.get('tag'):
+            # Through table (tag_id) index, then the question primary key
+            queryset = queryset.filter(tags__name_lower=params['tag'].strip().lower())
+        if params.get('user') is not None:
+            try:
+                queryset = queryset.filter(user_id=int(params['user']))
+            except ValueError:
+                raise ValidationError({'user': 'Must be an integer id.'})
+
+        is_closed = self.get_boolean_param('is_closed')
+        if is_closed is not None:
+            queryset = queryset.filter(is_closed=is_closed)
+
+        # (NOT) EXISTS probes on the (question, created_at) answer index
+        answers = Answer.objects.filter(question_id=OuterRef('pk'))
+        if self.get_boolean_param('unanswered'):
+            queryset = queryset.filter(~Exists(answers))
+        has_best_answer = self.get_boolean_param('has_best_answer')
+        if has_best_answer is not None:
+            best = Exists(answers.filter(is_best_answer=True))
+            queryset = queryset.filter(best if has_best_answer else ~best)
+        return queryset
+
+    def get_queryset(self):
+        # Constant number of queries per page, whatever the page size
+        queryset = Question.objects.with_feed_relations(include_answers=not self.wants_summary())
+        return queryset.order_by(*self.get_sort_ordering())
+
+    def get_fingerprint(self, request, *args, **kwargs):
+        ordering = self.get_sort_ordering()  # rejects an unknown ?sort= as the feed itself would
+        feed = self.filter_queryset(Question.objects.all())
+        paginator = self.pagination_class()
+        if not paginator.is_requested(request):
+            # The plain list serializes every matching question anyway
+            return feed_fingerprint(feed, request.user)
+
+        # Only the rows on this page: the same keyset query the feed runs, on
+        # the ordering columns alone, then the aggregate over those ids
+        columns = [field.lstrip('-') for field in ordering]
+        page = paginator.paginate_queryset(feed.order_by(*ordering).only(*columns), request, view=self)
+        ids = [question.pk for question in page]
+        fingerprint = feed_fingerprint(Question.objects.filter(pk__in=ids), request.user)
+        fingerprint['page'] = (ids, paginator.has_next, paginator.has_previous)
+        return fingerprint
 
     def perform_create(self, serializer):
         # Instructors cannot create questions - only students
@@ -14,14 +170,36 @@ class QuestionListCreateView(generics.ListCreateAPIView):
             raise PermissionDenied("Instructors cannot create questions. Only students can ask questions.")
         serializer.save(user=self.request.user)
 
-class QuestionDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Question.objects.all()
-    serializer_class = QuestionSerializer
+class QuestionViewCountingMixin:
+    """Count a view on every GET, including those answered from the response cache"""
+
+    def count_view(self, request, question):
+        # Buffered and flushed in batches (questions.viewcounts); the read stays write-free
+        record_view(question.pk, viewer_key(request))
+        question.views += pending_views(question.pk)
+
+    def response_cache_hit(self, request, *args, **kwargs):
+        record_view(kwargs['pk'], viewer_key(request))
+
+    not_modified = response_cache_hit
+
+
+class QuestionDetailView(QuestionViewCountingMixin, QuestionETagMixin, AnonymousResponseCacheMixin,
+                         MyVoteContextMixin, QuestionRepresentationMixin, generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
+    def get_response_cache_namespaces(self, request, *args, **kwargs):
+        # Only this question's changes invalidate its page, not activity elsewhere
+        return (question_cache_namespace(kwargs['pk']),)
+
     def get_queryset(self):
-        # Optional: Optimize by prefetching tags
-        return Question.objects.all().prefetch_related('tags')
+        return Question.objects.with_feed_relations(include_answers=not self.wants_summary())
+    
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        self.count_view(request, instance)
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
     
     def perform_update(self, serializer):
         # Only allow question owner to update
@@ -34,3 +212,59 @@ class QuestionDetailView(generics.RetrieveUpdateDestroyAPIView):
         if instance.user != self.request.user:
             raise PermissionDenied("You can only delete your own questions")
         instance.delete()
+
+
+class QuestionThreadView(QuestionViewCountingMixin, QuestionETagMixin, AnonymousResponseCacheMixin,
+                         MyVoteContextMixin, generics.RetrieveAPIView):
+    """
+    Everything the question page needs in one response: the question, its
+    answers (best first), the comment tree of each of them under `comments`,
+    and the viewer's votes as `my_vote`.
+
+    A fixed number of queries whatever the size of the thread: question,
+    tags, answers with authors, all comments with authors, and the viewer's
+    votes.
+    """
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    serializer_class = QuestionSerializer
+
+    def get_response_cache_namespaces(self, request, *args, **kwargs):
+        return (question_cache_namespace(kwargs['pk']),)
+
+    def get_queryset(self):
+        return Question.objects.with_feed_relations()
+
+    def retrieve(self, request, *args, **kwargs):
+        question = self.get_object()
+        self.count_view(request, question)
+        data = self.get_serializer(question).data
+
+        trees = self.get_comment_trees(question)
+        question_type = registry.get_kind('question').content_type_id
+        answer_type = registry.get_kind('answer').content_type_id
+        data['comments'] = trees.get((question_type, question.pk), [])
+        for answer in data['answers']:
+            answer['comments'] = trees.get((answer_type, answer['id']), [])
+        return Response(data)
+
+    def get_comment_trees(self, question):
+        """Load the comments of the question and all its answers in one query, as one tree per target"""
+        question_type = registry.get_kind('question').content_type_id
+        answer_type = registry.get_kind('answer').content_type_id
+        answer_ids = [answer.pk for answer in question.answers.all()]
+        comments = (
+            Comment.objects
+            .filter(
+                Q(content_type_id=question_type, object_id=question.pk)
+                | Q(content_type_id=answer_type, object_id__in=answer_ids)
+            )
+            .select_related('user')
+            .order_by('created_at', 'id')
+        )
+        by_target = defaultdict(list)
+        for comment in comments:
+            by_target[(comment.content_type_id, comment.object_id)].append(comment)
+        return {
+            target: build_comment_tree(target_comments, serialize=lambda comment: dict(CommentSerializer(comment).data))
+            for target, target_comments in by_target.items()
+        }
@@ -3,6 +3,10 @@ ASGI config for studyflow project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve the project through this module (e.g. with an ASGI worker such as
+uvicorn) so long-lived streams like /api/notifications/stream/ run on the
+event loop instead of holding one WSGI worker thread per open connection.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
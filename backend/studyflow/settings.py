@@ -141,6 +141,20 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Logins accept a username or an email (users/backends.py)
+AUTHENTICATION_BACKENDS = ['users.backends.UsernameOrEmailBackend']
+
+# PBKDF2 work factor (users/hashers.py). Changing it re-hashes each password
+# on its next successful login; the default is Django's
+PASSWORD_HASHERS = [
+    'users.hashers.ConfigurablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+if os.environ.get('PASSWORD_HASH_ITERATIONS'):
+    PASSWORD_HASH_ITERATIONS = int(os.environ['PASSWORD_HASH_ITERATIONS'])
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -172,10 +186,63 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'users.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
+    # Reverse proxies in front of the app (1 on Render): client IPs are read
+    # from X-Forwarded-For accordingly (throttles, anonymous view counting)
+    'NUM_PROXIES': int(os.environ['NUM_PROXIES']) if os.environ.get('NUM_PROXIES') else None,
 }
 
 CORS_ALLOW_ALL_ORIGINS = True
 
+# Cache (versioned namespaces in core/caching.py, anonymous response cache in
+# core/mixins.py). CACHE_BACKEND: 'locmem' (default, per process), 'file'
+# (CACHE_LOCATION directory) or 'db' (run `python manage.py createcachetable`)
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+if CACHE_BACKEND == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_LOCATION', str(BASE_DIR / '.cache')),
+        }
+    }
+elif CACHE_BACKEND == 'db':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': os.environ.get('CACHE_LOCATION', 'studyflow_cache'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'studyflow',
+        }
+    }
+
+# Notification fan-out (see core/notifications.py)
+# 'thread' writes notifications from an in-process pool; in production set
+# 'worker' and run `python manage.py process_notification_outbox`, with a
+# CACHE_BACKEND shared between processes (checked by core/checks.py)
+NOTIFICATION_DISPATCHER = os.environ.get('NOTIFICATION_DISPATCHER', 'thread')
+# Outbox entries failing this many times are skipped and kept for inspection
+NOTIFICATION_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('NOTIFICATION_OUTBOX_MAX_ATTEMPTS', 5))
+
+# Question view counting (see questions/viewcounts.py): a viewer counts once per
+# question per dedup window; buffered views are written at most every interval
+QUESTION_VIEW_DEDUP_WINDOW = int(os.environ.get('QUESTION_VIEW_DEDUP_WINDOW', 60 * 30))
+QUESTION_VIEW_FLUSH_INTERVAL = float(os.environ.get('QUESTION_VIEW_FLUSH_INTERVAL', 10))
+
+
+# Token authentication (see users/authentication.py): resolved tokens are kept
+# per process for TOKEN_AUTH_CACHE_TTL seconds, or until a revocation marker in
+# the shared cache says otherwise (locmem: until the TTL); tokens expire
+# TOKEN_EXPIRY seconds after login (0 = never)
+TOKEN_AUTH_CACHE_SIZE = int(os.environ.get('TOKEN_AUTH_CACHE_SIZE', 10000))
+TOKEN_AUTH_CACHE_TTL = float(os.environ.get('TOKEN_AUTH_CACHE_TTL', 60))
+TOKEN_EXPIRY = int(os.environ.get('TOKEN_EXPIRY', 60 * 60 * 24 * 30))
+# Lifetime of the ?ticket= credentials EventSource clients open the
+# notification stream with (POST /api/notifications/stream/ticket/)
+STREAM_TICKET_MAX_AGE = int(os.environ.get('STREAM_TICKET_MAX_AGE', 60))
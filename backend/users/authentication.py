@@ -0,0 +1,175 @@
+# users/authentication.py
+"""
+Token authentication without a database query per request.
+
+DRF's TokenAuthentication joins Token and User on every request, including
+the frequent notification polls. CachedTokenAuthentication keeps resolved
+tokens in a per-process LRU (TOKEN_AUTH_CACHE_SIZE entries, each trusted for
+TOKEN_AUTH_CACHE_TTL seconds) and only goes to the database on a miss.
+
+Entries are dropped explicitly on logout and whenever the user row is saved
+or deleted (deactivation, role changes such as `manage.py make_instructor`).
+Other processes learn about it through a revocation marker in the shared
+cache (auth:revoked:<user id>, the time of the change), which every cache
+hit checks: entries resolved before the marker are dropped and the token is
+looked up again. That takes a shared cache backend (CACHE_BACKEND=db, file,
+...); with the per-process locmem default, other processes keep serving a
+revoked token or an old role until their entry's TTL runs out.
+
+Tokens expire TOKEN_EXPIRY seconds after they were issued (0 disables it);
+an expired token is deleted and the client has to log in again.
+
+Browsers' EventSource cannot send an Authorization header, so the
+notification stream also accepts a signed ticket in ?ticket= (see
+issue_stream_ticket). Tickets are valid for STREAM_TICKET_MAX_AGE seconds:
+long enough to open one stream, short enough that one leaked through an
+access log is of little use.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication, TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+STREAM_TICKET_SALT = 'users.authentication.stream-ticket'
+
+_lock = threading.Lock()
+_entries = OrderedDict()  # token key -> (user, token, trusted until, resolved at)
+
+
+def cache_size():
+    return getattr(settings, 'TOKEN_AUTH_CACHE_SIZE', 10000)
+
+
+def cache_ttl():
+    return getattr(settings, 'TOKEN_AUTH_CACHE_TTL', 60)
+
+
+def token_expiry():
+    return getattr(settings, 'TOKEN_EXPIRY', 60 * 60 * 24 * 30)
+
+
+def stream_ticket_max_age():
+    return getattr(settings, 'STREAM_TICKET_MAX_AGE', 60)
+
+
+def is_expired(token):
+    expiry = token_expiry()
+    return bool(expiry) and token.created + timedelta(seconds=expiry) <= timezone.now()
+
+
+def issue_token(user):
+    """The user's current token, replacing it if it has expired"""
+    token, created = Token.objects.get_or_create(user=user)
+    if not created and is_expired(token):
+        forget_token(token.key)
+        token.delete()
+        token = Token.objects.create(user=user)
+    return token
+
+
+def issue_stream_ticket(user):
+    """A signed, short-lived credential for opening the user's notification stream"""
+    return signing.dumps({'user': user.pk}, salt=STREAM_TICKET_SALT)
+
+
+def forget_token(key):
+    with _lock:
+        _entries.pop(key, None)
+
+
+def revocation_key(user_id):
+    return f'auth:revoked:{user_id}'
+
+
+def _mark_revoked(user_id):
+    # Outlives every entry resolved before now, wherever it was cached
+    cache.set(revocation_key(user_id), time.time(), timeout=int(cache_ttl()) + 1)
+
+
+def forget_user(user_id):
+    """Drop the user's cached tokens here, and (through the shared cache) in every other process"""
+    with _lock:
+        for key in [key for key, (user, *_) in _entries.items() if user.pk == user_id]:
+            del _entries[key]
+    # Again on commit: another process may have re-read the old row in between
+    _mark_revoked(user_id)
+    transaction.on_commit(lambda: _mark_revoked(user_id))
+
+
+def clear_token_cache():
+    with _lock:
+        _entries.clear()
+
+
+def _remember(key, user, token, resolved_at):
+    with _lock:
+        _entries[key] = (user, token, time.monotonic() + cache_ttl(), resolved_at)
+        _entries.move_to_end(key)
+        while len(_entries) > cache_size():
+            _entries.popitem(last=False)
+
+
+def _lookup(key):
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            return None
+        if entry[2] <= time.monotonic():
+            del _entries[key]
+            return None
+        _entries.move_to_end(key)
+    # Revoked, here or in another process, since the entry was resolved
+    revoked_at = cache.get(revocation_key(entry[0].pk))
+    if revoked_at is not None and revoked_at >= entry[3]:
+        forget_token(key)
+        return None
+    return entry
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication answered from the per-process LRU on hits"""
+
+    def authenticate_credentials(self, key):
+        entry = _lookup(key)
+        if entry is None:
+            # Taken before the query, so a revocation racing it still wins
+            resolved_at = time.time()
+            user, token = super().authenticate_credentials(key)
+            _remember(key, user, token, resolved_at)
+        else:
+            user, token, *_ = entry
+        if is_expired(token):
+            forget_token(key)
+            Token.objects.filter(key=key).delete()
+            raise exceptions.AuthenticationFailed('Token has expired.')
+        # Each request gets its own copy: views may modify and save request.user
+        return copy.deepcopy(user), token
+
+
+class StreamTicketAuthentication(BaseAuthentication):
+    """Authenticates a ?ticket= from issue_stream_ticket(), for EventSource clients"""
+
+    def authenticate(self, request):
+        ticket = request.query_params.get('ticket')
+        if not ticket:
+            return None
+        try:
+            data = signing.loads(ticket, salt=STREAM_TICKET_SALT, max_age=stream_ticket_max_age())
+        except signing.SignatureExpired:
+            raise exceptions.AuthenticationFailed('Stream ticket has expired.')
+        except signing.BadSignature:
+            raise exceptions.AuthenticationFailed('Invalid stream ticket.')
+        user = get_user_model().objects.filter(pk=data.get('user'), is_active=True).first()
+        if user is None:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+        return user, None
@@ -0,0 +1,39 @@
+# users/backends.py
+"""
+Log in with either a username or an email address, in a single query.
+
+An explicit email is looked up case-insensitively through the unique
+lower(email) index. A username containing '@' may also be an email (Django
+allows '@' in usernames), so both are tried in the same query, the username
+winning.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+User = get_user_model()
+
+
+class UsernameOrEmailBackend(ModelBackend):
+    def authenticate(self, request, username=None, password=None, email=None, **kwargs):
+        username = username or kwargs.get(User.USERNAME_FIELD)
+        if not (email or username) or password is None:
+            return None
+        if email:
+            user = User.objects.with_email(email).first()
+        elif '@' in username:
+            matches = User.objects.alias(email_lower=Lower('email')).filter(
+                Q(username=username) | (Q(email_lower=username.lower()) & ~Q(email=''))
+            )
+            user = min(matches, key=lambda match: match.username != username, default=None)
+        else:
+            user = User.objects.filter(username=username).first()
+        if user is None:
+            # Hash anyway so unknown accounts take as long as wrong passwords
+            User().set_password(password)
+            return None
+        # check_password() re-hashes and saves when the work factor changed
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,17 @@
+# users/hashers.py
+"""
+Password hashing with a configurable work factor.
+
+Login storms are bounded by PBKDF2's cost per attempt, so the iteration count
+is a setting (PASSWORD_HASH_ITERATIONS) instead of Django's release default.
+The algorithm name is unchanged: existing hashes keep verifying, and Django
+re-hashes a password with the current count on its next successful check.
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class ConfigurablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_HASH_ITERATIONS', PBKDF2PasswordHasher.iterations)
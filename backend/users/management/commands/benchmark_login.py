@@ -0,0 +1,62 @@
+import time
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+from users.models import User
+from users.views import LoginView
+
+BENCHMARK_PASSWORD = 'Benchmark-Pass-123'
+
+
+class Command(BaseCommand):
+    help = 'Measure login throughput through /api/login/ with throwaway users (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=50, help='Number of logins to time')
+        parser.add_argument('--users', type=int, default=10, help='Number of throwaway users to log in as')
+        parser.add_argument('--by', choices=['email', 'username'], default='email',
+                            help='Which identifier the logins send')
+
+    def handle(self, *args, **options):
+        logins = max(1, options['logins'])
+        user_count = max(1, options['users'])
+        hasher = get_hasher()
+        self.stdout.write(f"\nHasher: {hasher.algorithm}, {getattr(hasher, 'iterations', '-')} iterations")
+
+        view = LoginView.as_view()
+        factory = APIRequestFactory()
+        with transaction.atomic():
+            users = [
+                User.objects.create_user(
+                    username=f'login-benchmark-{i}', email=f'Login-Benchmark-{i}@example.com',
+                    password=BENCHMARK_PASSWORD,
+                )
+                for i in range(user_count)
+            ]
+            failures = 0
+            durations = []
+            with CaptureQueriesContext(connection) as queries:
+                for i in range(logins):
+                    user = users[i % user_count]
+                    identifier = user.email.lower() if options['by'] == 'email' else user.username
+                    request = factory.post('/api/login/', {options['by']: identifier, 'password': BENCHMARK_PASSWORD})
+                    started = time.perf_counter()
+                    response = view(request)
+                    durations.append(time.perf_counter() - started)
+                    failures += response.status_code != 200
+            transaction.set_rollback(True)
+
+        total = sum(durations)
+        p95 = sorted(durations)[min(logins - 1, int(logins * 0.95))]
+        self.stdout.write(f"  Logins: {logins} as {user_count} users, by {options['by']}")
+        self.stdout.write(f"  Throughput: {logins / total:.1f} logins/s (one process)")
+        self.stdout.write(f"  Latency: mean {total / logins * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms")
+        self.stdout.write(f"  Queries per login: {len(queries.captured_queries) / logins:.1f}")
+        if failures:
+            self.stdout.write(self.style.ERROR(f"\n❌ {failures} logins failed"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"\n✅ Benchmark finished (PASSWORD_HASH_ITERATIONS="
+                                                 f"{getattr(settings, 'PASSWORD_HASH_ITERATIONS', 'default')})"))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from core.voting import recompute_reputation
+
+
+class Command(BaseCommand):
+    help = 'Recompute every user reputation from the Vote table'
+
+    def handle(self, *args, **options):
+        updated = recompute_reputation()
+        self.stdout.write(self.style.SUCCESS(f"\n✅ Recomputed reputation for {updated} users"))
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:50
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_reputation(apps, schema_editor):
+    # Uses the per-post scores backfilled by the questions/answers vote counter migrations
+    User = apps.get_model('users', 'User')
+    Question = apps.get_model('questions', 'Question')
+    Answer = apps.get_model('answers', 'Answer')
+
+    def score_sum(model):
+        scores = (
+            model.objects
+            .filter(user=OuterRef('pk'))
+            .order_by()
+            .values('user')
+            .annotate(total=Sum('score'))
+            .values('total')
+        )
+        return Coalesce(Subquery(scores), Value(0))
+
+    User.objects.update(question_reputation=score_sum(Question), answer_reputation=score_sum(Answer))
+    User.objects.update(reputation=F('question_reputation') + F('answer_reputation'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_remove_user_website'),
+        ('questions', '0002_vote_counters'),
+        ('answers', '0003_vote_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='answer_reputation',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='question_reputation',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='reputation',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_reputation, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:54
+
+import django.db.models.functions.text
+import users.models
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_duplicate_emails(apps, schema_editor):
+    # Refuse to guess which account keeps a shared address; fix these by hand first
+    User = apps.get_model('users', 'User')
+    duplicates = list(
+        User.objects.exclude(email='')
+        .annotate(email_lower=Lower('email'))
+        .values('email_lower')
+        .annotate(accounts=Count('id'))
+        .filter(accounts__gt=1)
+        .values_list('email_lower', flat=True)
+    )
+    if duplicates:
+        raise RuntimeError(
+            "Emails shared by several accounts (case-insensitively): " + ', '.join(duplicates)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0004_user_reputation'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        migrations.AlterModelManagers(
+            name='user',
+            managers=[
+                ('objects', users.models.StudyFlowUserManager()),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), condition=models.Q(('email', ''), _negated=True), name='users_user_email_ci_unique'),
+        ),
+    ]
@@ -1,6 +1,17 @@
 from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
+from django.db.models import Q
+from django.db.models.functions import Lower
 from django.utils import timezone
+
+
+class StudyFlowUserManager(UserManager):
+    def with_email(self, email):
+        """Users whose email matches case-insensitively, through the unique lower(email) index"""
+        # The email condition lets the planner use the partial index
+        return self.alias(email_lower=Lower('email')).filter(email_lower=email.lower()).exclude(email='')
+
+
 class User(AbstractUser):
     """
     Custom User model for StudyFlow platform
@@ -22,6 +33,19 @@ class User(AbstractUser):
     bio = models.TextField(max_length=500, blank=True)
     profile_picture = models.ImageField(upload_to='profile_pics/', blank=True, null=True)
     
+    # Reputation = net votes received, kept up to date by core.voting
+    reputation = models.IntegerField(default=0)
+    question_reputation = models.IntegerField(default=0)
+    answer_reputation = models.IntegerField(default=0)
+    
+    objects = StudyFlowUserManager()
+    
+    class Meta(AbstractUser.Meta):
+        constraints = [
+            # Emails identify users at login: unique whatever their case, blank ones aside
+            models.UniqueConstraint(Lower('email'), condition=~Q(email=''), name='users_user_email_ci_unique'),
+        ]
+    
     
     def __str__(self):
         return self.username
@@ -0,0 +1,38 @@
+# users/profile.py
+"""
+Small, cached profile payload for the navbar (/api/me/).
+
+Entries are dropped whenever the user row is saved. Reputation is updated
+with UPDATE statements that send no signal, so it may lag by up to
+PROFILE_CACHE_TTL seconds.
+"""
+from django.core.cache import cache
+
+PROFILE_CACHE_TTL = 60
+
+
+def profile_cache_key(user_id):
+    return f'users:profile:{user_id}'
+
+
+def build_profile(user):
+    return {
+        "id": user.id,
+        "username": user.username,
+        "role": user.role,
+        "profile_picture": user.profile_picture.url if user.profile_picture else None,
+        "reputation": user.reputation,
+    }
+
+
+def get_profile(user):
+    key = profile_cache_key(user.id)
+    profile = cache.get(key)
+    if profile is None:
+        profile = build_profile(user)
+        cache.set(key, profile, PROFILE_CACHE_TTL)
+    return profile
+
+
+def invalidate_profile(user_id):
+    cache.delete(profile_cache_key(user_id))
@@ -7,8 +7,17 @@ User = get_user_model()
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
-        fields = ['id', 'username', 'email', 'first_name', 'last_name', 'role', 'bio', 'profile_picture']
-        read_only_fields = ['role'] # Specific role logic might handle this, but usually we let specific endpoints set it or default to student
+        fields = ['id', 'username', 'email', 'first_name', 'last_name', 'role', 'bio', 'profile_picture', 'reputation']
+        read_only_fields = ['role', 'reputation'] # Specific role logic might handle this, but usually we let specific endpoints set it or default to student
+
+    def validate_email(self, value):
+        # Emails are unique case-insensitively (users_user_email_ci_unique)
+        others = User.objects.with_email(value) if value else User.objects.none()
+        if self.instance is not None:
+            others = others.exclude(pk=self.instance.pk)
+        if others.exists():
+            raise serializers.ValidationError("A user with this email already exists.")
+        return value
 
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
@@ -19,7 +28,7 @@ class RegisterSerializer(serializers.ModelSerializer):
         fields = ['username', 'email', 'password', 'role', 'bio', 'first_name', 'last_name']
     
     def validate_email(self, value):
-        if User.objects.filter(email=value).exists():
+        if value and User.objects.with_email(value).exists():
             raise serializers.ValidationError("A user with this email already exists.")
         return value
 
@@ -51,18 +60,8 @@ class LoginSerializer(serializers.Serializer):
         if not username and not email:
              raise serializers.ValidationError("Username or Email is required.")
 
-        user = None
-        
-        # Authenticate with email if provided
-        if email:
-            try:
-                user_obj = User.objects.get(email=email)
-                username = user_obj.username
-            except User.DoesNotExist:
-                raise serializers.ValidationError("Invalid credentials.")
-        
-        # Use Django's authenticate which expects a username (conceptually)
-        user = authenticate(username=username, password=password)
+        # One lookup by username or (case-insensitive) email, see users.backends
+        user = authenticate(self.context.get('request'), username=username, email=email, password=password)
 
         if not user:
             raise serializers.ValidationError("Invalid credentials.")
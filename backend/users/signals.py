@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from users.models import User
+from users.profile import invalidate_profile
+from users.authentication import forget_user
+
+@receiver(post_save, sender=User)
+def drop_cached_profile(sender, instance, **kwargs):
+    """Avatar, role and name changes must show up on the next /api/me/ call"""
+    invalidate_profile(instance.pk)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def drop_cached_tokens(sender, instance, **kwargs):
+    """Deactivation and role changes (make_instructor) must apply to the next request"""
+    forget_user(instance.pk)
@@ -4,10 +4,16 @@ from rest_framework.test import APIClient
 from rest_framework import status
 from questions.models import Question
 from answers.models import Answer
-from core.models import Comment
+from core.models import Comment, Vote
 from django.contrib.contenttypes.models import ContentType
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from PIL import Image
+from io import StringIO
+from unittest import mock
 import io
 
 User = get_user_model()
@@ -338,3 +344,349 @@ class PermissionSecurityTestCase(TestCase):
             'status': 'resolved'
         })
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ReputationTestCase(TestCase):
+    """Test cases for incrementally maintained reputation"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.author = User.objects.create_user(
+            username='author',
+            email='author@example.com',
+            password='pass123'
+        )
+        self.voter = User.objects.create_user(
+            username='voter',
+            email='voter@example.com',
+            password='pass123'
+        )
+        self.question = Question.objects.create(title='Question', body='Body', user=self.author)
+        self.answer = Answer.objects.create(question=self.question, body='Answer', user=self.author)
+        self.client.force_authenticate(user=self.voter)
+    
+    def vote(self, vote_type, content_type, object_id):
+        return self.client.post('/api/votes/', {
+            'vote_type': vote_type,
+            'content_type': content_type,
+            'object_id': object_id
+        })
+    
+    def test_votes_update_reputation_breakdown(self):
+        """Test that creating, flipping and removing votes adjusts the author's reputation"""
+        self.vote('up', 'question', self.question.id)
+        self.vote('down', 'answer', self.answer.id)
+        self.author.refresh_from_db()
+        self.assertEqual((self.author.question_reputation, self.author.answer_reputation, self.author.reputation), (1, -1, 0))
+        
+        self.vote('up', 'answer', self.answer.id)
+        self.author.refresh_from_db()
+        self.assertEqual((self.author.answer_reputation, self.author.reputation), (1, 2))
+        
+        self.vote('up', 'question', self.question.id)
+        self.author.refresh_from_db()
+        self.assertEqual((self.author.question_reputation, self.author.reputation), (0, 1))
+    
+    def test_deleting_content_revokes_its_reputation(self):
+        """Test that deleting a voted question removes the reputation it earned"""
+        self.vote('up', 'question', self.question.id)
+        self.vote('up', 'answer', self.answer.id)
+        self.question.refresh_from_db()
+        self.question.delete()
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.reputation, 0)
+    
+    def test_deleting_votes_elsewhere_settles_counters(self):
+        """Test that votes removed by admin deletes or with the voter's account are taken back"""
+        other = User.objects.create_user(username='other', email='other@example.com', password='pass123')
+        self.vote('up', 'question', self.question.id)
+        self.vote('down', 'answer', self.answer.id)
+        self.client.force_authenticate(user=other)
+        self.vote('up', 'question', self.question.id)
+        
+        Vote.objects.filter(user=other).delete()
+        self.question.refresh_from_db()
+        self.assertEqual((self.question.upvotes, self.question.score), (1, 1))
+        
+        self.voter.delete()
+        self.question.refresh_from_db()
+        self.answer.refresh_from_db()
+        self.author.refresh_from_db()
+        self.assertEqual((self.question.upvotes, self.question.score), (0, 0))
+        self.assertEqual((self.answer.downvotes, self.answer.score), (0, 0))
+        self.assertEqual((self.author.question_reputation, self.author.answer_reputation, self.author.reputation), (0, 0, 0))
+    
+    def test_deleting_voters_content_revokes_reputation_of_answers_under_it(self):
+        """Test that a cascade through a deleted account takes back reputation earned by others"""
+        helper = User.objects.create_user(username='helper', email='helper@example.com', password='pass123')
+        answer = Answer.objects.create(question=self.question, body='Help', user=helper)
+        self.vote('up', 'answer', answer.id)
+        helper.refresh_from_db()
+        self.assertEqual(helper.reputation, 1)
+        
+        self.author.delete()
+        helper.refresh_from_db()
+        self.assertEqual((helper.answer_reputation, helper.reputation), (0, 0))
+    
+    def test_dashboard_reads_stored_reputation(self):
+        """Test that the dashboard reports the stored reputation without vote queries"""
+        self.vote('up', 'question', self.question.id)
+        self.author.refresh_from_db()
+        self.client.force_authenticate(user=self.author)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/dashboard/')
+        self.assertEqual(response.data['stats']['reputation_score'], 1)
+        self.assertEqual(response.data['stats']['breakdown']['question_votes'], 1)
+        self.assertFalse(any('core_vote' in q['sql'] for q in queries.captured_queries))
+    
+    def test_recompute_reputation_command(self):
+        """Test that the command rebuilds reputation from the Vote table"""
+        Vote.objects.create(
+            user=self.voter,
+            vote_type='up',
+            content_type=ContentType.objects.get_for_model(Answer),
+            object_id=self.answer.id
+        )
+        User.objects.filter(pk=self.author.pk).update(reputation=42, question_reputation=42)
+        
+        call_command('recompute_reputation', stdout=StringIO())
+        
+        self.author.refresh_from_db()
+        self.assertEqual((self.author.question_reputation, self.author.answer_reputation, self.author.reputation), (0, 1, 1))
+
+
+class MeEndpointsTestCase(TestCase):
+    """Test cases for the lightweight profile and paginated activity endpoints"""
+    
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='student',
+            email='student@example.com',
+            password='pass123'
+        )
+        self.other = User.objects.create_user(
+            username='other',
+            email='other@example.com',
+            password='pass123'
+        )
+        self.client.force_authenticate(user=self.user)
+    
+    def test_me_returns_small_profile(self):
+        """Test that /api/me/ returns only the navbar fields"""
+        response = self.client.get('/api/me/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data), {'id', 'username', 'role', 'profile_picture', 'reputation'})
+        self.assertEqual(response.data['username'], 'student')
+    
+    def test_me_is_cached_and_invalidated_on_save(self):
+        """Test that the profile is served from cache until the user is saved"""
+        self.client.get('/api/me/')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/me/')
+        self.assertEqual(len(queries.captured_queries), 0)
+        
+        self.user.role = 'instructor'
+        self.user.save()
+        self.assertEqual(self.client.get('/api/me/').data['role'], 'instructor')
+    
+    def test_me_questions_paginated_and_scoped(self):
+        """Test that /api/me/questions/ pages through the user's own questions only"""
+        for i in range(3):
+            Question.objects.create(title=f'Mine {i}', body='Body', user=self.user)
+        Question.objects.create(title='Not mine', body='Body', user=self.other)
+        
+        response = self.client.get('/api/me/questions/?page_size=2')
+        self.assertEqual([q['title'] for q in response.data['results']], ['Mine 2', 'Mine 1'])
+        self.assertNotIn('answers', response.data['results'][0])
+        response = self.client.get(response.data['next'])
+        self.assertEqual([q['title'] for q in response.data['results']], ['Mine 0'])
+    
+    def test_me_answers_paginated(self):
+        """Test that /api/me/answers/ lists the user's answers newest first"""
+        question = Question.objects.create(title='Question', body='Body', user=self.other)
+        for i in range(2):
+            Answer.objects.create(question=question, body=f'Answer {i}', user=self.user)
+        Answer.objects.create(question=question, body='Not mine', user=self.other)
+        
+        response = self.client.get('/api/me/answers/')
+        self.assertEqual([a['body'] for a in response.data['results']], ['Answer 1', 'Answer 0'])
+        self.assertEqual(response.data['results'][0]['question_title'], 'Question')
+
+
+class CachedTokenAuthenticationTestCase(TestCase):
+    """Test the cached token authenticator, its invalidation and token expiry"""
+    
+    def setUp(self):
+        from users.authentication import clear_token_cache
+        
+        cache.clear()
+        clear_token_cache()
+        self.addCleanup(clear_token_cache)
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='student', email='student@example.com', password='pass123')
+        response = self.client.post('/api/login/', {'email': 'student@example.com', 'password': 'pass123'})
+        self.token = response.data['token']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token}')
+    
+    def test_repeat_requests_skip_the_token_query(self):
+        """Test that a known token is resolved without touching the database"""
+        self.client.get('/api/me/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/me/')
+        self.assertEqual(response.data['username'], 'student')
+    
+    def test_logout_revokes_cached_token(self):
+        """Test that a token stops working right after logout"""
+        self.client.get('/api/me/')
+        self.assertEqual(self.client.post('/api/logout/').status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get('/api/me/').status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_deactivation_applies_immediately(self):
+        """Test that deactivating a user drops their cached token"""
+        self.client.get('/api/me/')
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/me/').status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_make_instructor_applies_immediately(self):
+        """Test that a role change through make_instructor reaches the next request"""
+        self.client.get('/api/me/')
+        call_command('make_instructor', 'student', stdout=StringIO())
+        response = self.client.post('/api/posts/', {'title': 'Question', 'body': 'Body'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+    
+    def test_revocation_in_another_process_applies_to_cached_tokens(self):
+        """Test that a revocation marker newer than a cached entry forces a fresh lookup"""
+        import time
+        from users.authentication import revocation_key
+        
+        self.client.get('/api/me/')
+        # What another process leaves behind after deactivating the user: the
+        # row changed and the marker is set, but this process's entry is untouched
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.client.get('/api/me/').status_code, status.HTTP_200_OK)
+        cache.set(revocation_key(self.user.pk), time.time())
+        self.assertEqual(self.client.get('/api/me/').status_code, status.HTTP_401_UNAUTHORIZED)
+        
+        # Entries resolved after the marker are trusted again
+        User.objects.filter(pk=self.user.pk).update(is_active=True)
+        self.client.get('/api/me/')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/me/').status_code, status.HTTP_200_OK)
+    
+    def test_expired_token_is_rejected_and_replaced_on_login(self):
+        """Test that expired tokens fail and logging in again issues a new one"""
+        from django.utils import timezone
+        from datetime import timedelta
+        from rest_framework.authtoken.models import Token
+        
+        Token.objects.filter(key=self.token).update(created=timezone.now() - timedelta(days=365))
+        self.assertEqual(self.client.get('/api/me/').status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertFalse(Token.objects.filter(key=self.token).exists())
+        
+        self.client.credentials()
+        response = self.client.post('/api/login/', {'email': 'student@example.com', 'password': 'pass123'})
+        self.assertNotEqual(response.data['token'], self.token)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {response.data['token']}")
+        self.assertEqual(self.client.get('/api/me/').status_code, status.HTTP_200_OK)
+        
+        # Cached tokens expire too
+        later = timezone.now() + timedelta(days=365)
+        with mock.patch('users.authentication.timezone.now', return_value=later):
+            self.assertEqual(self.client.get('/api/me/').status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_cache_is_bounded(self):
+        """Test that the least recently used tokens are evicted beyond TOKEN_AUTH_CACHE_SIZE"""
+        from users import authentication
+        
+        other = User.objects.create_user(username='other', email='other@example.com', password='pass123')
+        other_token = authentication.issue_token(other).key
+        with self.settings(TOKEN_AUTH_CACHE_SIZE=1):
+            self.client.get('/api/me/')
+            self.client.credentials(HTTP_AUTHORIZATION=f'Token {other_token}')
+            self.client.get('/api/me/')
+        self.assertEqual(list(authentication._entries), [other_token])
+
+
+class LoginPathTestCase(TestCase):
+    """Test case-insensitive unique emails, the username-or-email backend and re-hashing"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='student', email='Student@Example.com', password='pass123')
+    
+    def login(self, **credentials):
+        return self.client.post('/api/login/', {'password': 'pass123', **credentials})
+    
+    def test_login_by_email_ignores_case(self):
+        """Test that the email matches whatever its case"""
+        response = self.login(email='STUDENT@example.COM')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['user']['username'], 'student')
+    
+    def test_login_by_username_or_email_in_username_field(self):
+        """Test that the username field accepts a username or an email"""
+        self.assertEqual(self.login(username='student').status_code, status.HTTP_200_OK)
+        self.assertEqual(self.login(username='student@example.com').status_code, status.HTTP_200_OK)
+        self.assertEqual(self.login(username='nobody').status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_user_lookup_is_a_single_query(self):
+        """Test that authenticating costs one user query"""
+        from django.contrib.auth import authenticate
+        
+        with self.assertNumQueries(1):
+            self.assertEqual(authenticate(email='student@example.com', password='pass123'), self.user)
+        with self.assertNumQueries(1):
+            self.assertIsNone(authenticate(email='nobody@example.com', password='pass123'))
+    
+    def test_email_is_unique_case_insensitively(self):
+        """Test that another account cannot reuse an email in a different case"""
+        from django.db import IntegrityError, transaction
+        
+        response = self.client.post('/api/register/', {
+            'username': 'copy', 'email': 'student@EXAMPLE.com', 'password': 'SecurePass123!', 'role': 'student',
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            User.objects.create_user(username='copy', email='STUDENT@example.com', password='pass123')
+        # Blank emails are not identities
+        User.objects.create_user(username='blank1', email='', password='pass123')
+        User.objects.create_user(username='blank2', email='', password='pass123')
+    
+    def test_profile_update_rejects_taken_email(self):
+        """Test that changing your email to another user's, in any case, is a 400 and not a 500"""
+        other = User.objects.create_user(username='other', email='other@example.com', password='pass123')
+        self.client.force_authenticate(user=other)
+        response = self.client.post('/api/upload-profile-image/', {'email': 'STUDENT@example.com'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('email', response.data)
+        response = self.client.post('/api/upload-profile-image/', {'email': 'Other@Example.com'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
+    def test_email_lookup_uses_the_index(self):
+        """Test that the email lookup is answered from the lower(email) index"""
+        with CaptureQueriesContext(connection) as queries:
+            list(User.objects.with_email('student@example.com'))
+        with connection.cursor() as cursor:
+            prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+            cursor.execute(prefix + queries.captured_queries[0]['sql'])
+            plan = ' '.join(str(row) for row in cursor.fetchall())
+        self.assertIn('users_user_email_ci_unique', plan)
+    
+    def test_password_rehashed_when_work_factor_changes(self):
+        """Test that a successful login re-hashes the password with the configured iterations"""
+        with self.settings(PASSWORD_HASH_ITERATIONS=1000):
+            self.assertEqual(self.login(email='student@example.com').status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$1000$'))
+        self.assertTrue(self.user.check_password('pass123'))
+    
+    def test_benchmark_command(self):
+        """Test that the login benchmark runs and leaves no users behind"""
+        out = StringIO()
+        with self.settings(PASSWORD_HASH_ITERATIONS=1000):
+            call_command('benchmark_login', '--logins', '3', '--users', '2', stdout=out)
+        self.assertIn('logins/s', out.getvalue())
+        self.assertFalse(User.objects.filter(username__startswith='login-benchmark-').exists())
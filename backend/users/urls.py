@@ -1,11 +1,17 @@
 from django.urls import path
-from .views import RegisterView, LoginView, LogoutView, UserDashboardView, UserAvatarUploadView, PopularTagsView
+from .views import (
+    RegisterView, LoginView, LogoutView, UserDashboardView, UserAvatarUploadView, PopularTagsView,
+    MeView, MyQuestionsView, MyAnswersView,
+)
 
 urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
     path('login/', LoginView.as_view(), name='login'),
     path('logout/', LogoutView.as_view(), name='logout'),
     path('dashboard/', UserDashboardView.as_view(), name='user_dashboard'),
+    path('me/', MeView.as_view(), name='me'),
+    path('me/questions/', MyQuestionsView.as_view(), name='my_questions'),
+    path('me/answers/', MyAnswersView.as_view(), name='my_answers'),
     path('upload-profile-image/', UserAvatarUploadView.as_view(), name='upload_profile_image'),
     path('tags/popular/', PopularTagsView.as_view(), name='popular_tags'),
 ]
\ No newline at end of file
@@ -1,15 +1,16 @@
 from rest_framework import generics, status
+from core.pagination import FeedCursorPagination
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.authtoken.models import Token
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from django.contrib.contenttypes.models import ContentType
 from .serializers import RegisterSerializer, LoginSerializer, UserSerializer
+from .profile import get_profile
+from .authentication import forget_user, issue_token
 from questions.models import Question
 from answers.models import Answer
-from core.models import Vote
-from core.models import Tag
-from questions.serializers import QuestionSerializer
+from core.tagging import TAGS_CACHE_NAMESPACE, popular_tags
+from core.mixins import AnonymousResponseCacheMixin
+from questions.serializers import QuestionSerializer, QuestionSummarySerializer
 from answers.serializers import AnswerSerializer
 
 from rest_framework.parsers import MultiPartParser, FormParser
@@ -47,7 +48,7 @@ class RegisterView(generics.CreateAPIView):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
-        token, created = Token.objects.get_or_create(user=user)
+        token = issue_token(user)
         
         return Response({
             "token": token.key,
@@ -59,10 +60,10 @@ class LoginView(APIView):
     serializer_class = LoginSerializer # Helpful for docs
 
     def post(self, request):
-        serializer = LoginSerializer(data=request.data)
+        serializer = LoginSerializer(data=request.data, context={'request': request})
         serializer.is_valid(raise_exception=True)
         user = serializer.validated_data['user']
-        token, created = Token.objects.get_or_create(user=user)
+        token = issue_token(user)
         
         return Response({
             "token": token.key,
@@ -76,17 +77,18 @@ class LogoutView(APIView):
     def post(self, request):
         try:
             request.user.auth_token.delete()
+            forget_user(request.user.pk)
             return Response({'message': 'Successfully logged out'}, status=status.HTTP_200_OK)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-class PopularTagsView(APIView):
+class PopularTagsView(AnonymousResponseCacheMixin, generics.ListAPIView):
     permission_classes = [AllowAny] 
+    response_cache_namespaces = (TAGS_CACHE_NAMESPACE,)
 
-    def get(self, request):
-        tags = Tag.objects.order_by('-usage_count')[:5]
-        data = [{"id": tag.id, "name": tag.name, "count": tag.usage_count} for tag in tags]
-        return Response(data)
+    # list(), not get(), so that AnonymousResponseCacheMixin.get() stays in charge
+    def list(self, request, *args, **kwargs):
+        return Response(popular_tags(limit=5))
 
 class UserDashboardView(APIView):
     permission_classes = [IsAuthenticated]
@@ -104,33 +106,10 @@ class UserDashboardView(APIView):
         answers_count = answers.count()
         answers_data = AnswerSerializer(answers, many=True).data
         
-        # 3. Total Reputations (Upvotes - Downvotes)
-        # We need to sum votes on the user's Questions AND Answers
-        
-        # Helper to calculate net votes for a specific model type
-        def get_votes_for_model(model_class, user):
-            ct = ContentType.objects.get_for_model(model_class)
-            # Find IDs of objects owned by user
-            object_ids = model_class.objects.filter(user=user).values_list('id', flat=True)
-            
-            upvotes = Vote.objects.filter(
-                content_type=ct, 
-                object_id__in=object_ids, 
-                vote_type='up'
-            ).count()
-            
-            downvotes = Vote.objects.filter(
-                content_type=ct, 
-                object_id__in=object_ids, 
-                vote_type='down'
-            ).count()
-            
-            return upvotes - downvotes
-
-        question_reputation = get_votes_for_model(Question, user)
-        answer_reputation = get_votes_for_model(Answer, user)
-        
-        total_reputation = question_reputation + answer_reputation
+        # 3. Reputation (Upvotes - Downvotes), maintained incrementally by core.voting
+        question_reputation = user.question_reputation
+        answer_reputation = user.answer_reputation
+        total_reputation = user.reputation
 
         return Response({
             "username": user.username,
@@ -150,4 +129,29 @@ class UserDashboardView(APIView):
                     "answer_votes": answer_reputation
                 }
             }
-        })
\ No newline at end of file
+        })
+
+class MeView(APIView):
+    """Lightweight, cached profile for the navbar (username, role, avatar, reputation)"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response(get_profile(request.user))
+
+class MyQuestionsView(generics.ListAPIView):
+    """The current user's questions, newest first, cursor-paginated"""
+    serializer_class = QuestionSummarySerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = FeedCursorPagination
+
+    def get_queryset(self):
+        return Question.objects.filter(user=self.request.user).with_feed_relations(include_answers=False)
+
+class MyAnswersView(generics.ListAPIView):
+    """The current user's answers, newest first, cursor-paginated"""
+    serializer_class = AnswerSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = FeedCursorPagination
+
+    def get_queryset(self):
+        return Answer.objects.filter(user=self.request.user).select_related('user', 'question')